@@ -1,16 +1,64 @@
 """Backend selection layer for local WSL or remote SSH execution."""
 from __future__ import annotations
 
+import base64
+import codecs
+import queue
 import subprocess
 import os
-from typing import Callable, Optional
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import IO, Callable, Iterator, List, Optional, Tuple
 
 from .run_result import RunResult
-from . import wsl, settings
+from . import parsing, wsl, settings
 
 ssh_backend = None
 
 
+PIPE_BUFSIZE = 65536
+_PS_QUOTE_TABLE = str.maketrans({"'": "''"})
+
+# Resolved once: PATH lookup and STARTUPINFO setup are identical for every PowerShell spawn.
+# Popen copies startupinfo before use, so sharing one instance is safe.
+_POWERSHELL_EXE = shutil.which("powershell") or "powershell"
+if os.name == "nt":
+    _WIN_STARTUPINFO = subprocess.STARTUPINFO()
+    _WIN_STARTUPINFO.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    _POPEN_WIN_KW = {"creationflags": subprocess.CREATE_NO_WINDOW, "startupinfo": _WIN_STARTUPINFO}
+else:
+    _WIN_STARTUPINFO = None
+    _POPEN_WIN_KW = {}
+
+
+def _drain_pipe(stream: IO[bytes], buf: bytearray, callback: Optional[Callable[[str], None]]) -> None:
+    """Read a pipe in large blocks into buf; decode incrementally only when a callback wants text."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace") if callback else None
+    fd = stream.fileno()
+    try:
+        while True:
+            block = os.read(fd, PIPE_BUFSIZE)
+            buf += block
+            if decoder is not None:
+                text = decoder.decode(block, final=not block)
+                if text:
+                    callback(text)
+            if not block:
+                break
+    except OSError:
+        pass
+    finally:
+        stream.close()
+
+
+def _decode(buf: bytes) -> str:
+    return buf.decode("utf-8", errors="replace")
+
+
 def _ensure_ssh_backend():
     global ssh_backend
     if ssh_backend is not None:
@@ -23,6 +71,13 @@ def _ensure_ssh_backend():
 
 
 class BaseBackend:
+    mode = ""
+
+    def __init__(self) -> None:
+        # OS/arch never change for a backend instance; switching backends builds a new one.
+        self._os_cache: Optional[str] = None
+        self._arch_cache: Optional[str] = None
+
     def bash_single_quote(self, text: str) -> str:
         raise NotImplementedError
 
@@ -42,7 +97,9 @@ class BaseBackend:
         cmd: str,
         password: Optional[str],
         timeout: Optional[int] = None,
+        input_text: Optional[str] = None,
     ) -> RunResult:
+        """Run cmd as root; input_text, when given, is fed to the command's stdin."""
         raise NotImplementedError
 
     def stream_as_root(
@@ -64,16 +121,31 @@ class BaseBackend:
     def detect_arch(self) -> str:
         raise NotImplementedError
 
+    def detect_system(self) -> Tuple[str, str]:
+        """Return (os_name, arch); backends that shell out override this to use one round-trip."""
+        return self.detect_os(), self.detect_arch()
+
 
 class WSLBackend(BaseBackend):
+    mode = "wsl"
+
     def bash_single_quote(self, text: str) -> str:
         return wsl.bash_single_quote(text)
 
     def run_shell(self, script: str, input_text: Optional[str] = None, timeout: Optional[int] = None) -> RunResult:
         return wsl.run_wsl_bash(script, input_text=input_text, timeout=timeout)
 
-    def run_as_root(self, cmd: str, password: Optional[str], timeout: Optional[int] = None) -> RunResult:
-        return wsl.run_as_root(cmd, password, timeout=timeout)
+    def run_as_root(
+        self,
+        cmd: str,
+        password: Optional[str],
+        timeout: Optional[int] = None,
+        input_text: Optional[str] = None,
+    ) -> RunResult:
+        if not password:
+            # No sudo attempt to make; go straight to the root-user path.
+            return wsl.run_wsl_root_user(cmd, timeout=timeout, input_text=input_text)
+        return wsl.run_as_root(cmd, password, timeout=timeout, input_text=input_text)
 
     def stream_as_root(
         self,
@@ -83,39 +155,242 @@ class WSLBackend(BaseBackend):
         stdout_cb: Optional[Callable[[str], None]],
         stderr_cb: Optional[Callable[[str], None]],
     ) -> RunResult:
+        if not password:
+            return wsl.stream_wsl_root_user(cmd, timeout, stdout_cb, stderr_cb)
         return wsl.stream_as_root(cmd, password, timeout, stdout_cb, stderr_cb)
 
     def description(self) -> str:
         return "Local WSL"
 
+    def detect_system(self) -> Tuple[str, str]:
+        if self._os_cache is None or self._arch_cache is None:
+            res = self.run_shell(parsing.SYSTEM_PROBE_SCRIPT, timeout=5)
+            os_name, arch = parsing.split_system_probe(res.stdout)
+            if not res.ok:
+                # A cold wsl.exe start can outlast the timeout; answer now but re-probe next call.
+                return os_name or "WSL (Unknown Linux)", arch or "unknown"
+            self._os_cache = os_name or "WSL (Linux)"
+            self._arch_cache = arch or "unknown"
+        return self._os_cache, self._arch_cache
+
     def detect_os(self) -> str:
-        # Simple WSL detection
-        res = self.run_shell("grep -E '^(PRETTY_NAME|NAME)=' /etc/os-release || uname -s", timeout=5)
-        if not res.ok:
-            return "WSL (Unknown Linux)"
-        text = res.stdout.strip()
-        if "PRETTY_NAME=" in text:
-            for line in text.splitlines():
-                if line.startswith("PRETTY_NAME="):
-                    return line.split("=", 1)[1].strip('"')
-        if "NAME=" in text:
-             for line in text.splitlines():
-                if line.startswith("NAME="):
-                    return line.split("=", 1)[1].strip('"')
-        return text or "WSL (Linux)"
+        return self.detect_system()[0]
 
     def detect_arch(self) -> str:
-        res = self.run_shell("uname -m", timeout=5)
-        return res.stdout.strip() if res.ok else "unknown"
+        return self.detect_system()[1]
+
+
+# Host process body. Commands arrive on an inherited pipe handle rather than stdin: the host's own
+# stdin is NUL, so native children (which inherit it) can neither prompt nor swallow later commands.
+_PS_HOST_BOOT = (
+    "[Console]::OutputEncoding = [System.Text.Encoding]::UTF8; "
+    "$__fs = New-Object IO.FileStream((New-Object Microsoft.Win32.SafeHandles.SafeFileHandle([IntPtr]@HANDLE@, $true)), 'Read'); "
+    "$__in = New-Object IO.StreamReader($__fs, (New-Object Text.UTF8Encoding($false))); "
+    "while ($null -ne ($__line = $__in.ReadLine())) { Invoke-Expression $__line }"
+)
+
+# Runs one base64-encoded script in a fresh runspace of the persistent host, so `exit` or leftover
+# variables in a script cannot affect the host or later commands. Exit code semantics mirror
+# `powershell -Command`: `exit N` wins, otherwise 1 when the last statement failed, else 0.
+# A hostless runspace turns native stderr into NativeCommandError records that clear $? even on
+# exit 0, so when those are the only errors the native exit code decides instead.
+_PS_HOST_COMMAND = (
+    "$__out = New-Object 'System.Management.Automation.PSDataCollection[psobject]'; "
+    "$__ps = [PowerShell]::Create(); $__rs = [RunspaceFactory]::CreateRunspace(); $__c = 0; "
+    "try { $__rs.Open(); $__ps.Runspace = $__rs; "
+    "$__s = [Text.Encoding]::UTF8.GetString([Convert]::FromBase64String('@B64@')) + \"`n\" + '$global:__codex_ok = $?'; "
+    "[void]$__ps.AddScript($__s).AddCommand('Out-String').AddParameter('Stream'); "
+    "$__ps.Invoke($null, $__out); "
+    "if ($__rs.SessionStateProxy.GetVariable('__codex_ok') -eq $false) { "
+    "$__x = $__rs.SessionStateProxy.GetVariable('LASTEXITCODE'); "
+    "$__n = @($__ps.Streams.Error | Where-Object { $_.FullyQualifiedErrorId -notlike 'NativeCommandError*' }).Count; "
+    "if ($__n -or $__x -ne 0) { $__c = 1 } } "
+    "} catch { $__e = $_.Exception; "
+    "while ($__e.InnerException -and -not ($__e -is [System.Management.Automation.ExitException])) { $__e = $__e.InnerException }; "
+    "if ($__e -is [System.Management.Automation.ExitException]) { $__c = [int]$__e.Argument } "
+    "else { [Console]::Error.WriteLine($_.ToString()); $__c = 1 } "
+    "} finally { "
+    "foreach ($__l in $__out) { [Console]::Out.WriteLine($__l) }; "
+    "foreach ($__l in $__ps.Streams.Error) { [Console]::Error.WriteLine($__l.ToString()) }; "
+    "$__ps.Dispose(); $__rs.Dispose() }; "
+    "[Console]::Out.WriteLine('@END@' + $__c); [Console]::Error.WriteLine('@END@')"
+)
+
+
+class _PSHost:
+    """Long-lived PowerShell process that runs scripts framed by sentinel lines.
+
+    Spawning powershell.exe costs hundreds of milliseconds per call; the host pays it once.
+    Callers fall back to a one-off spawn whenever the host cannot be started, is busy with
+    another call, or fails, so concurrent callers never queue behind a long-running script.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._proc: Optional[subprocess.Popen] = None
+        self._cmd_fd: Optional[int] = None
+        self._path: Optional[str] = None
+        self._stdout_q: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._stderr_q: "queue.Queue[Optional[str]]" = queue.Queue()
+
+    @staticmethod
+    def _pump(stream: IO[bytes], q: "queue.Queue[Optional[str]]") -> None:
+        try:
+            for raw in iter(stream.readline, b""):
+                q.put(raw.decode("utf-8", errors="replace"))
+        except (OSError, ValueError):
+            pass
+        finally:
+            q.put(None)
+
+    def _start(self) -> bool:
+        try:
+            import msvcrt
+        except ImportError:
+            return False
+        read_fd, write_fd = os.pipe()
+        try:
+            read_handle = msvcrt.get_osfhandle(read_fd)
+            os.set_handle_inheritable(read_handle, True)
+            # handle_list limits inheritance to this pipe end (plus the std handles Popen adds).
+            startupinfo = subprocess.STARTUPINFO(
+                dwFlags=_WIN_STARTUPINFO.dwFlags,
+                lpAttributeList={"handle_list": [read_handle]},
+            )
+            proc = subprocess.Popen(
+                [
+                    _POWERSHELL_EXE, "-NoProfile", "-NoLogo", "-NonInteractive",
+                    "-Command", _PS_HOST_BOOT.replace("@HANDLE@", str(read_handle)),
+                ],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                bufsize=PIPE_BUFSIZE,
+                creationflags=subprocess.CREATE_NO_WINDOW,
+                startupinfo=startupinfo,
+            )
+        except OSError:
+            os.close(write_fd)
+            return False
+        finally:
+            os.close(read_fd)
+        self._stdout_q = queue.Queue()
+        self._stderr_q = queue.Queue()
+        for stream, q in ((proc.stdout, self._stdout_q), (proc.stderr, self._stderr_q)):
+            threading.Thread(target=self._pump, args=(stream, q), daemon=True).start()
+        self._proc = proc
+        self._cmd_fd = write_fd
+        # Children inherit PATH at spawn; restart if the app later edits it (e.g. after an install).
+        self._path = os.environ.get("PATH")
+        return True
+
+    def _send(self, line: str) -> bool:
+        if self._proc is None or self._cmd_fd is None:
+            return False
+        data = line.encode("utf-8") + b"\n"
+        try:
+            while data:
+                data = data[os.write(self._cmd_fd, data):]
+            return True
+        except OSError:
+            self._stop()
+            return False
+
+    def _stop(self) -> None:
+        proc, self._proc = self._proc, None
+        cmd_fd, self._cmd_fd = self._cmd_fd, None
+        if cmd_fd is not None:
+            try:
+                os.close(cmd_fd)
+            except OSError:
+                pass
+        if proc is None:
+            return
+        try:
+            proc.kill()
+            proc.wait(timeout=1)
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+
+    def _alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None and self._path == os.environ.get("PATH")
+
+    @staticmethod
+    def _collect(
+        q: "queue.Queue[Optional[str]]",
+        marker: str,
+        deadline: Optional[float],
+        lines: List[str],
+    ) -> Optional[str]:
+        """Gather lines until the marker line; return its suffix, or None on timeout.
+
+        Raises EOFError when the host exits before printing the marker.
+        """
+        while True:
+            wait = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                line = q.get(timeout=wait)
+            except queue.Empty:
+                return None
+            if line is None:
+                raise EOFError
+            if line.startswith(marker):
+                return line[len(marker):].strip()
+            lines.append(line)
+
+    def run(self, script: str, timeout: Optional[int]) -> Optional[RunResult]:
+        """Run script in the host; None means the host was unavailable and nothing was executed."""
+        if not self._lock.acquire(blocking=False):
+            return None  # Busy with another call: a one-off spawn beats waiting behind it.
+        try:
+            if not self._alive():
+                self._stop()
+                if not self._start():
+                    return None
+            marker = f"__CODEX_END_{uuid.uuid4().hex}__"
+            payload = base64.b64encode(script.encode("utf-8")).decode("ascii")
+            line = _PS_HOST_COMMAND.replace("@B64@", payload).replace("@END@", marker)
+            if not self._send(line):
+                return None
+            deadline = None if timeout is None else time.monotonic() + timeout
+            out_lines: List[str] = []
+            err_lines: List[str] = []
+            try:
+                code_text = self._collect(self._stdout_q, marker, deadline, out_lines)
+                if code_text is not None and self._collect(self._stderr_q, marker, deadline, err_lines) is None:
+                    # stderr never reached its marker; the streams are out of step, so start fresh next time.
+                    self._stop()
+            except EOFError:
+                self._stop()
+                return RunResult(False, 1, "".join(out_lines), "".join(err_lines) or "PowerShell host exited unexpectedly")
+            stdout = "".join(out_lines)
+            stderr = "".join(err_lines)
+            if code_text is None:
+                self._stop()
+                return RunResult(False, 124, stdout, f"Timeout after {timeout or 0} seconds")
+            try:
+                code = int(code_text)
+            except ValueError:
+                code = 1
+            return RunResult(code == 0, code, stdout, stderr)
+        finally:
+            self._lock.release()
+
+
+_PS_HOST = _PSHost()
 
 
 class WindowsBackend(BaseBackend):
+    mode = "windows"
+
     def bash_single_quote(self, text: str) -> str:  # pragma: no cover - naming for compatibility
         return self.shell_quote(text)
 
     def shell_quote(self, text: str) -> str:
         # PowerShell single-quote escaping
-        return "'" + text.replace("'", "''") + "'"
+        if "'" not in text:
+            return "'" + text + "'"
+        return "'" + text.translate(_PS_QUOTE_TABLE) + "'"
 
     def run_shell(
         self,
@@ -123,29 +398,27 @@ class WindowsBackend(BaseBackend):
         input_text: Optional[str] = None,
         timeout: Optional[int] = None,
     ) -> RunResult:
-        args = ["powershell", "-NoProfile", "-Command", script]
-        creationflags = subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0
-        startupinfo = None
-        if os.name == "nt":
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        if input_text is None:
+            result = _PS_HOST.run(script, timeout)
+            if result is not None:
+                return result
+        args = [_POWERSHELL_EXE, "-NoProfile", "-Command", script]
         try:
+            # Capture bytes and decode once instead of going through a TextIOWrapper.
             cp = subprocess.run(
                 args,
-                input=input_text,
-                capture_output=True,
-                text=True,
-                encoding="utf-8",
-                errors="replace",
+                input=input_text.encode("utf-8") if input_text is not None else None,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                bufsize=PIPE_BUFSIZE,
                 timeout=timeout,
-                creationflags=creationflags,
-                startupinfo=startupinfo,
+                **_POPEN_WIN_KW,
             )
-            return RunResult(cp.returncode == 0, cp.returncode, cp.stdout, cp.stderr)
+            return RunResult(cp.returncode == 0, cp.returncode, _decode(cp.stdout), _decode(cp.stderr))
         except FileNotFoundError as exc:
             return RunResult(False, 127, "", f"powershell not found: {exc}")
         except subprocess.TimeoutExpired as exc:
-            return RunResult(False, 124, exc.stdout or "", f"Timeout: {exc}")
+            return RunResult(False, 124, _decode(exc.stdout or b""), f"Timeout: {exc}")
         except Exception as exc:  # pragma: no cover - defensive
             return RunResult(False, 1, "", f"Exception: {exc}")
 
@@ -154,9 +427,10 @@ class WindowsBackend(BaseBackend):
         cmd: str,
         password: Optional[str],
         timeout: Optional[int] = None,
+        input_text: Optional[str] = None,
     ) -> RunResult:
         # No sudo concept on Windows; just run the command
-        return self.run_shell(cmd, timeout=timeout)
+        return self.run_shell(cmd, input_text=input_text, timeout=timeout)
 
     def stream_as_root(
         self,
@@ -166,93 +440,126 @@ class WindowsBackend(BaseBackend):
         stdout_cb: Optional[Callable[[str], None]],
         stderr_cb: Optional[Callable[[str], None]],
     ) -> RunResult:
-        args = ["powershell", "-NoProfile", "-Command", cmd]
-        creationflags = subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0
-        startupinfo = None
-        if os.name == "nt":
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        args = [_POWERSHELL_EXE, "-NoProfile", "-Command", cmd]
         try:
             proc = subprocess.Popen(
                 args,
                 stdin=subprocess.PIPE if password else None,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                text=True,
-                encoding="utf-8",
-                errors="replace",
-                creationflags=creationflags,
-                startupinfo=startupinfo,
+                bufsize=PIPE_BUFSIZE,
+                **_POPEN_WIN_KW,
             )
         except FileNotFoundError as exc:
             return RunResult(False, 127, "", f"powershell not found: {exc}")
-        stdout_text = []
-        stderr_text = []
+        stdout_buf = bytearray()
+        stderr_buf = bytearray()
+        # Drain both pipes concurrently so a chatty stderr cannot stall stdout.
+        threads: List[threading.Thread] = []
+        for stream, buf, callback in (
+            (proc.stdout, stdout_buf, stdout_cb),
+            (proc.stderr, stderr_buf, stderr_cb),
+        ):
+            if stream is None:
+                continue
+            t = threading.Thread(target=_drain_pipe, args=(stream, buf, callback), daemon=True)
+            t.start()
+            threads.append(t)
         try:
-            if proc.stdout:
-                for line in proc.stdout:
-                    stdout_text.append(line)
-                    if stdout_cb:
-                        stdout_cb(line)
-            if proc.stderr:
-                for line in proc.stderr:
-                    stderr_text.append(line)
-                    if stderr_cb:
-                        stderr_cb(line)
             proc.wait(timeout=timeout)
         except subprocess.TimeoutExpired:
             proc.kill()
-            return RunResult(False, 124, "".join(stdout_text), "Timeout")
+            try:
+                proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                pass
+            # Grandchildren may still hold the pipes open; don't let the drainers hold us hostage.
+            for t in threads:
+                t.join(timeout=1.0)
+            return RunResult(False, 124, _decode(bytes(stdout_buf)), _decode(bytes(stderr_buf)) or "Timeout")
+        for t in threads:
+            t.join()
         code = proc.returncode if proc.returncode is not None else 1
-        return RunResult(code == 0, code, "".join(stdout_text), "".join(stderr_text))
+        return RunResult(code == 0, code, _decode(stdout_buf), _decode(stderr_buf))
 
     def description(self) -> str:
         return "Local Windows"
 
     def detect_os(self) -> str:
-        return f"Windows {os.name}"
+        if self._os_cache is None:
+            self._os_cache = f"Windows {os.name}"
+        return self._os_cache
 
     def detect_arch(self) -> str:
-        return os.environ.get("PROCESSOR_ARCHITECTURE", "unknown")
+        if self._arch_cache is None:
+            self._arch_cache = os.environ.get("PROCESSOR_ARCHITECTURE", "unknown")
+        return self._arch_cache
+
+
+_SSH_FORWARDED = ("run_shell", "run_as_root", "stream_as_root", "description")
 
 
 class SSHBackend(BaseBackend):
+    mode = "remote"
+
     def __init__(self, host: str, port: int, username: str, password: str):
+        super().__init__()
         _ensure_ssh_backend()
+        self.host = host
+        self.port = port
+        self.username = username
         self._impl = ssh_backend.SSHBackend(host=host, port=port, username=username, password=password)
+        # Bind the implementation's methods onto the instance: instance attributes shadow the
+        # BaseBackend stubs, so each remote call is one frame instead of a forwarding wrapper.
+        self.bash_single_quote = ssh_backend.bash_single_quote
+        for name in _SSH_FORWARDED:
+            setattr(self, name, getattr(self._impl, name))
+
+    def __getattr__(self, name: str):
+        # Only reached for names the wrapper does not define; cache the bound method on first use.
+        if name.startswith("__") or name == "_impl":
+            raise AttributeError(name)
+        meth = getattr(self._impl, name)
+        setattr(self, name, meth)
+        return meth
+
+    def detect_system(self) -> Tuple[str, str]:
+        if self._os_cache is None or self._arch_cache is None:
+            res = self.run_shell(parsing.SYSTEM_PROBE_SCRIPT, None, 5)
+            os_name, arch = parsing.split_system_probe(res.stdout)
+            if not res.ok:
+                # Slow or dropped connection: answer now but re-probe next call.
+                return os_name or "Unknown Linux", arch or "unknown"
+            self._os_cache = os_name or "Unknown Linux"
+            self._arch_cache = arch or "unknown"
+        return self._os_cache, self._arch_cache
 
-    def bash_single_quote(self, text: str) -> str:
-        return ssh_backend.bash_single_quote(text)
+    def detect_os(self) -> str:
+        return self.detect_system()[0]
 
-    def run_shell(self, script: str, input_text: Optional[str] = None, timeout: Optional[int] = None) -> RunResult:
-        return self._impl.run_shell(script, input_text=input_text, timeout=timeout)
+    def detect_arch(self) -> str:
+        return self.detect_system()[1]
 
-    def run_as_root(self, cmd: str, password: Optional[str], timeout: Optional[int] = None) -> RunResult:
-        return self._impl.run_as_root(cmd, password=password, timeout=timeout)
 
-    def stream_as_root(
-        self,
-        cmd: str,
-        password: Optional[str],
-        timeout: Optional[int],
-        stdout_cb: Optional[Callable[[str], None]],
-        stderr_cb: Optional[Callable[[str], None]],
-    ) -> RunResult:
-        return self._impl.stream_as_root(cmd, password=password, timeout=timeout, stdout_cb=stdout_cb, stderr_cb=stderr_cb)
-
-    def description(self) -> str:
-        return self._impl.description()
+_current_backend: BaseBackend = WindowsBackend()
+# Optional per-context override. ContextVars do not flow into new threads, so the process-wide
+# selection above stays the default and threads/tasks opt in via pinned_backend().
+_backend_override: ContextVar[Optional[BaseBackend]] = ContextVar("codex_backend", default=None)
 
-    def detect_os(self) -> str:
-        return self._impl.detect_os()
 
-    def detect_arch(self) -> str:
-        return self._impl.detect_arch()
+def current_backend() -> BaseBackend:
+    return _backend_override.get() or _current_backend
 
 
-_current_backend: BaseBackend = WindowsBackend()
-_mode: str = "windows"
-_remote_settings: Optional[dict] = None
+@contextmanager
+def pinned_backend(selected: Optional[BaseBackend] = None) -> Iterator[BaseBackend]:
+    """Bind a backend to the current context so a backend switch cannot affect in-flight work."""
+    chosen = selected or current_backend()
+    token = _backend_override.set(chosen)
+    try:
+        yield chosen
+    finally:
+        _backend_override.reset(token)
 
 
 def use_local_backend() -> None:
@@ -260,66 +567,64 @@ def use_local_backend() -> None:
 
 
 def use_windows_backend() -> None:
-    global _current_backend, _mode, _remote_settings
+    global _current_backend
     _current_backend = WindowsBackend()
-    _mode = "windows"
-    _remote_settings = None
 
 
 def use_wsl_backend() -> None:
-    global _current_backend, _mode, _remote_settings
+    global _current_backend
     if not wsl.available():
         raise RuntimeError("WSL is not available on this system.")
     _current_backend = WSLBackend()
-    _mode = "wsl"
-    _remote_settings = None
 
 
 def use_remote_backend(host: str, port: int, username: str, password: str) -> None:
-    global _current_backend, _mode, _remote_settings
+    global _current_backend
     _current_backend = SSHBackend(host=host, port=port, username=username, password=password)
-    _mode = "remote"
-    _remote_settings = {
-        "host": host,
-        "port": port,
-        "username": username,
-    }
 
 
 def is_remote() -> bool:
-    return _mode == "remote"
+    return current_backend().mode == "remote"
 
 
 def is_wsl() -> bool:
-    return _mode == "wsl"
+    return current_backend().mode == "wsl"
 
 
 def is_windows() -> bool:
-    return _mode == "windows"
+    return current_backend().mode == "windows"
 
 
 def remote_settings() -> Optional[dict]:
-    return _remote_settings.copy() if _remote_settings else None
+    active = current_backend()
+    if not isinstance(active, SSHBackend):
+        return None
+    return {"host": active.host, "port": active.port, "username": active.username}
 
 
 def backend_description() -> str:
-    return _current_backend.description()
+    return current_backend().description()
 
 
 def bash_single_quote(text: str) -> str:
-    return _current_backend.bash_single_quote(text)
+    return current_backend().bash_single_quote(text)
 
 
 def shell_quote(text: str) -> str:
-    return _current_backend.shell_quote(text)
+    return current_backend().shell_quote(text)
 
 
 def run_shell(script: str, input_text: Optional[str] = None, timeout: Optional[int] = None) -> RunResult:
-    return _current_backend.run_shell(script, input_text=input_text, timeout=timeout)
+    return current_backend().run_shell(script, input_text=input_text, timeout=timeout)
 
 
-def run_as_root(cmd: str, password: Optional[str], timeout: Optional[int] = None) -> RunResult:
-    return _current_backend.run_as_root(cmd, password, timeout=timeout)
+def run_as_root(
+    cmd: str,
+    password: Optional[str],
+    timeout: Optional[int] = None,
+    input_text: Optional[str] = None,
+) -> RunResult:
+    return current_backend().run_as_root(cmd, password, timeout=timeout, input_text=input_text)
 
 
 def stream_as_root(
@@ -329,13 +634,40 @@ def stream_as_root(
     stdout_cb: Optional[Callable[[str], None]],
     stderr_cb: Optional[Callable[[str], None]],
 ) -> RunResult:
-    return _current_backend.stream_as_root(cmd, password, timeout, stdout_cb, stderr_cb)
+    return current_backend().stream_as_root(cmd, password, timeout, stdout_cb, stderr_cb)
+
+
+def stream_as_root_lines(
+    cmd: str,
+    password: Optional[str],
+    timeout: Optional[int],
+    line_cb: Callable[[str], None],
+    sep: str = "\n",
+) -> RunResult:
+    """Run a root command, handing each complete stdout line to line_cb as soon as it arrives.
+
+    sep sets the record terminator, e.g. "\\0" for find -printf '...\\0' output.
+    """
+    pending = [""]
+
+    def _on_stdout(chunk: str) -> None:
+        *complete, pending[0] = (pending[0] + chunk).split(sep)
+        for line in complete:
+            line_cb(line)
+
+    result = current_backend().stream_as_root(cmd, password, timeout, _on_stdout, None)
+    if pending[0]:
+        line_cb(pending[0])
+    return result
 
 
 def detect_os() -> str:
-    return _current_backend.detect_os()
+    return current_backend().detect_os()
 
 
 def detect_arch() -> str:
-    return _current_backend.detect_arch()
+    return current_backend().detect_arch()
+
 
+def detect_system() -> Tuple[str, str]:
+    return current_backend().detect_system()
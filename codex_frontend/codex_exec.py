@@ -1,27 +1,34 @@
 """Codex CLI orchestration helpers."""
 from __future__ import annotations
 
+import functools
+import heapq
 import os
 import re
-from typing import Dict, List, Optional, Tuple, Callable
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple, Callable
 from pathlib import Path
 import json
 
 from .run_result import RunResult
 from . import settings
 from . import backend
+from . import history
+from . import parsing
 
 SESSION_FILE_RE = re.compile(
-    r"rollout-[0-9T:-]+-(?P<sid>[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})\.jsonl$"
+    r"rollout-[0-9T:-]+-(?P<sid>[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})\.jsonl$",
+    re.ASCII,
 )
 
 
+_EXEC_PREFIX = "codex --search --dangerously-bypass-approvals-and-sandbox exec --skip-git-repo-check "
+_RESUME_PREFIX = _EXEC_PREFIX + "resume "
+_RESUME_LAST_PREFIX = _EXEC_PREFIX + "resume --last "
+
+
 def codex_exec_prompt(prompt: str, password: Optional[str], timeout: int = 900) -> RunResult:
-    cmd = (
-        "codex --search --dangerously-bypass-approvals-and-sandbox "
-        "exec --skip-git-repo-check "
-        f"{backend.shell_quote(prompt)}"
-    )
+    cmd = _EXEC_PREFIX + backend.shell_quote(prompt)
     return backend.run_as_root(cmd, password, timeout=timeout)
 
 
@@ -32,11 +39,7 @@ def codex_exec_prompt_stream(
     stderr_cb,
     timeout: int = 900,
 ) -> RunResult:
-    cmd = (
-        "codex --search --dangerously-bypass-approvals-and-sandbox "
-        "exec --skip-git-repo-check "
-        f"{backend.shell_quote(prompt)}"
-    )
+    cmd = _EXEC_PREFIX + backend.shell_quote(prompt)
     return backend.stream_as_root(cmd, password, timeout, stdout_cb, stderr_cb)
 
 
@@ -49,86 +52,228 @@ def codex_resume_prompt_stream(
     timeout: int = 900,
 ) -> RunResult:
     if session_id:
-        resume_target = session_id.strip()
-        cmd = (
-            "codex --search --dangerously-bypass-approvals-and-sandbox "
-            "exec --skip-git-repo-check resume "
-            f"{backend.shell_quote(resume_target)} {backend.shell_quote(prompt)}"
-        )
+        cmd = f"{_RESUME_PREFIX}{backend.shell_quote(session_id.strip())} {backend.shell_quote(prompt)}"
     else:
-        cmd = (
-            "codex --search --dangerously-bypass-approvals-and-sandbox "
-            "exec --skip-git-repo-check resume --last "
-            f"{backend.shell_quote(prompt)}"
-        )
+        cmd = _RESUME_LAST_PREFIX + backend.shell_quote(prompt)
     return backend.stream_as_root(cmd, password, timeout, stdout_cb, stderr_cb)
 
 
+class CodexProbe(NamedTuple):
+    """Everything the startup/update checks need, gathered in one shell round-trip."""
+
+    shell_ok: bool
+    codex_path: str
+    codex_ok: bool
+    codex_version: str
+    npm_path: str
+    npm_version: str
+    output: str
+
+
+# Each probe line is "FIELD|value"; absent fields stay empty.
+_PROBE_SCRIPT = r"""
+echo "SHELL_OK|1"
+p=$(command -v codex 2>/dev/null)
+echo "CODEX_PATH|$p"
+if [ -n "$p" ]; then
+    v=$(codex --version 2>&1)
+    rc=$?
+    echo "CODEX_RC|$rc"
+    echo "CODEX_VER|$(printf '%s' "$v" | head -n 1)"
+fi
+n=$(command -v npm 2>/dev/null)
+echo "NPM_PATH|$n"
+"""
+
+# The registry lookup is network-bound, so it starts in the background before the
+# codex probe and is collected (or killed, if codex is unusable) afterwards.
+_PROBE_NPM_START = r"""
+npm_out=$(mktemp 2>/dev/null || echo "/tmp/codex_npm_$$")
+npm_pid=""
+if command -v npm >/dev/null 2>&1; then
+    if command -v timeout >/dev/null 2>&1; then
+        timeout 3s npm view @openai/codex version >"$npm_out" 2>/dev/null &
+    else
+        npm view @openai/codex version >"$npm_out" 2>/dev/null &
+    fi
+    npm_pid=$!
+fi
+"""
+
+_PROBE_NPM_FINISH = r"""
+if [ -n "$npm_pid" ]; then
+    if [ "$rc" = 0 ]; then
+        wait "$npm_pid"
+        echo "NPM_VER|$(head -n 1 "$npm_out")"
+    else
+        kill "$npm_pid" 2>/dev/null
+    fi
+fi
+rm -f "$npm_out"
+"""
+
+_WINDOWS_PROBE_SCRIPT = r"""
+[Console]::OutputEncoding = [System.Text.Encoding]::UTF8
+Write-Output "SHELL_OK|1"
+$candidates = @()
+try {
+    $where = where.exe codex 2>$null
+    if ($where) { $candidates += ($where -split "`n") }
+} catch {}
+$candidates += "$env:USERPROFILE\.codex\codex.exe"
+$candidates += "$env:USERPROFILE\bin\codex.exe"
+$found = ""
+foreach ($c in $candidates) {
+    $p = $c.Trim()
+    if (-not $p) { continue }
+    if (Test-Path $p) { $found = $p; break }
+}
+Write-Output "CODEX_PATH|$found"
+if ($found) {
+    $v = (& $found --version 2>&1 | Select-Object -First 1)
+    Write-Output "CODEX_RC|$LASTEXITCODE"
+    Write-Output "CODEX_VER|$v"
+}
+"""
+
+
+def _parse_probe(res: RunResult) -> CodexProbe:
+    fields: Dict[str, str] = {}
+    for line in (res.stdout or "").splitlines():
+        key, sep, value = line.partition("|")
+        if sep:
+            fields[key.strip()] = value.strip()
+    return CodexProbe(
+        shell_ok="SHELL_OK" in fields,
+        codex_path=fields.get("CODEX_PATH", ""),
+        codex_ok=fields.get("CODEX_RC") == "0",
+        codex_version=fields.get("CODEX_VER", ""),
+        npm_path=fields.get("NPM_PATH", ""),
+        npm_version=fields.get("NPM_VER", ""),
+        output=(res.stdout or "").strip() or (res.stderr or "").strip(),
+    )
+
+
+_windows_probe_cache: Optional[CodexProbe] = None
+
+
+def _windows_probe() -> CodexProbe:
+    # A found codex.exe only moves when we install it, so that answer is kept for the process.
+    # Misses are not: a host timeout or a codex installed outside the app must be seen next call.
+    global _windows_probe_cache
+    if _windows_probe_cache is not None:
+        return _windows_probe_cache
+    probe = _parse_probe(backend.run_shell(_WINDOWS_PROBE_SCRIPT))
+    if probe.codex_ok and probe.codex_path:
+        _windows_probe_cache = probe
+    return probe
+
+
+def invalidate_codex_path_cache() -> None:
+    """Forget the cached Windows codex location/version (call after installing codex)."""
+    global _windows_probe_cache
+    _windows_probe_cache = None
+
+
+def probe_codex(password: Optional[str] = None, as_root: bool = False, with_npm: bool = False) -> CodexProbe:
+    """Check the shell, locate codex, read its version and (optionally) npm's latest in one call."""
+    if backend.is_windows():
+        return _windows_probe()
+    script = _PROBE_NPM_START + _PROBE_SCRIPT + _PROBE_NPM_FINISH if with_npm else _PROBE_SCRIPT
+    if as_root:
+        return _parse_probe(backend.run_as_root(script, password, timeout=10))
+    return _parse_probe(backend.run_shell(script))
+
+
 def check_shell_ready() -> Tuple[bool, str]:
-    result = backend.run_shell("echo SHELL_OK")
-    ok = result.ok and "SHELL_OK" in (result.stdout or "")
-    return (ok, (result.stdout or "").strip() or (result.stderr or "").strip())
+    probe = probe_codex()
+    return probe.shell_ok, "SHELL_OK" if probe.shell_ok else probe.output
 
 
 def check_codex_installed() -> Tuple[bool, str]:
-    if backend.is_windows():
-        path = _find_windows_codex_path()
-    else:
-        result = backend.run_shell("command -v codex || true")
-        path = result.stdout.strip()
-    
+    probe = probe_codex()
+    path = probe.codex_path
     if not path:
         return False, "codex not found in PATH"
-        
+
     # Verify it runs (catch Exec format error, etc)
-    if backend.is_windows():
-        cmd = f"& {backend.shell_quote(path)} --version"
-    else:
-        cmd = "codex --version"
-        
-    res = backend.run_shell(cmd)
-    if not res.ok:
-        return False, f"codex found at {path} but failed to run: {res.stderr or res.stdout}"
+    if not probe.codex_ok:
+        return False, f"codex found at {path} but failed to run: {probe.codex_version or probe.output}"
 
     return True, path
 
 
-def log_codex_help() -> str:
+@functools.lru_cache(maxsize=1)
+def _codex_help(target: str) -> str:
+    # Keyed on the backend description so switching WSL/SSH targets re-reads it.
     result = backend.run_shell("codex --help")
     return (result.stdout or result.stderr or "").strip()
 
 
+def invalidate_help_cache() -> None:
+    _codex_help.cache_clear()
+
+
+def log_codex_help(force: bool = False) -> str:
+    if force:
+        invalidate_help_cache()
+    return _codex_help(backend.backend_description())
+
+
 
 # Updates / install -------------------------------------------------
 
 
+def _load_update_cache() -> Dict[str, Dict[str, object]]:
+    try:
+        with settings.update_cache_path().open("r", encoding="utf-8") as fh:
+            data = json.load(fh)
+    except Exception:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _save_update_cache(key: str, **entry: object) -> None:
+    data = _load_update_cache()
+    entry["checked_at"] = time.time()
+    data[key] = entry
+    path = settings.update_cache_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as fh:
+            json.dump(data, fh, indent=2)
+        tmp_path.replace(path)
+    except OSError:
+        pass
+
+
+def _fresh_update_entry(key: str) -> Dict[str, object]:
+    """Return the cached update-check entry for key, or {} once it is older than the TTL."""
+    entry = _load_update_cache().get(key)
+    if not isinstance(entry, dict):
+        return {}
+    try:
+        age = time.time() - float(entry.get("checked_at", 0))
+    except (TypeError, ValueError):
+        return {}
+    return entry if 0 <= age < settings.UPDATE_CHECK_TTL_SECONDS else {}
+
+
 def _find_windows_codex_path() -> str:
     r"""Return an existing codex.exe path if present (PATH, %USERPROFILE%\.codex, or %USERPROFILE%\bin)."""
     if not backend.is_windows():
         return ""
-    script = r"""
-[Console]::OutputEncoding = [System.Text.Encoding]::UTF8
-$candidates = @()
-try {
-    $where = where.exe codex 2>$null
-    if ($where) { $candidates += ($where -split "`n") }
-} catch {}
-$candidates += "$env:USERPROFILE\.codex\codex.exe"
-$candidates += "$env:USERPROFILE\bin\codex.exe"
-foreach ($c in $candidates) {
-    $p = $c.Trim()
-    if (-not $p) { continue }
-    if (Test-Path $p) { Write-Output $p; break }
-}
-"""
-    res = backend.run_shell(script)
-    return res.stdout.strip().splitlines()[0].strip() if res.ok and res.stdout else ""
+    return probe_codex().codex_path
 
 
 def _windows_latest_release() -> Tuple[bool, str, str]:
     """Return (ok, version_tag, url) for latest Windows codex asset (prefers newest, including prerelease)."""
     if not backend.is_windows():
         return False, "", "not windows"
+    cached = _fresh_update_entry("windows-release")
+    if cached.get("tag") and cached.get("url"):
+        return True, str(cached["tag"]), str(cached["url"])
     script = r"""
 $rel = Invoke-RestMethod -UseBasicParsing https://api.github.com/repos/openai/codex/releases?per_page=1
 $rel = $rel | Select-Object -First 1
@@ -139,26 +284,54 @@ Write-Output ("OK|" + $rel.tag_name + "|" + $asset.browser_download_url)
     res = backend.run_shell(script)
     if not res.ok or not res.stdout:
         return False, "", "failed to query releases"
-    line = res.stdout.strip()
+    line = parsing.first_line(res.stdout)
     if not line.startswith("OK|"):
         return False, "", line
     _, tag, url = line.split("|", 2)
+    _save_update_cache("windows-release", tag=tag, url=url)
     return True, tag, url
 
 
-def _current_codex_version() -> Optional[str]:
-    if backend.is_windows():
-        path = _find_windows_codex_path()
-        cmd = f"& {backend.shell_quote(path)} --version" if path else "codex --version"
-    else:
-        cmd = "codex --version"
-    res = backend.run_shell(cmd)
-    if not res.ok or not res.stdout:
+def _current_codex_version(probe: Optional[CodexProbe] = None) -> Optional[str]:
+    probe = probe or probe_codex()
+    if not probe.codex_ok or not probe.codex_version:
         return None
-    parts = res.stdout.strip().split()
+    parts = probe.codex_version.split()
     return parts[-1] if parts else None
 
 
+_APT_NPM = "apt-get update -qq && apt-get install -y -qq nodejs npm"
+_DNF_NPM = "if command -v dnf >/dev/null; then dnf install -y -q nodejs npm; else yum install -y -q nodejs npm; fi"
+_PACMAN_NPM = "pacman -Sy --noconfirm nodejs npm"
+_BREW_NPM = "brew install node"
+
+# First family with a keyword contained in the detected OS name wins, so order matters.
+_PKG_FAMILIES: Tuple[Tuple[Tuple[str, ...], str], ...] = (
+    (("debian", "ubuntu", "kali", "mint", "pop"), _APT_NPM),
+    (("fedora", "red hat", "rhel", "centos", "amzn", "alma", "rocky", "oracle"), _DNF_NPM),
+    (("arch", "manjaro", "endeavour"), _PACMAN_NPM),
+    (("darwin",), _BREW_NPM),
+)
+
+_UNIVERSAL_NPM = (
+    "if command -v apt-get >/dev/null; then apt-get update -qq && apt-get install -y -qq nodejs npm; "
+    "elif command -v dnf >/dev/null; then dnf install -y -q nodejs npm; "
+    "elif command -v yum >/dev/null; then yum install -y -q nodejs npm; "
+    "elif command -v pacman >/dev/null; then pacman -Sy --noconfirm nodejs npm; "
+    "elif command -v brew >/dev/null; then brew install node; "
+    "else echo 'ERROR|Package manager not found'; exit 1; fi"
+)
+
+
+def _npm_install_command(os_name: str) -> str:
+    """Pick the nodejs/npm install command for the detected OS, probing package managers if unknown."""
+    name = os_name.lower()
+    for keywords, cmd in _PKG_FAMILIES:
+        if any(word in name for word in keywords):
+            return cmd
+    return _UNIVERSAL_NPM
+
+
 def ensure_remote_codex_latest(password: Optional[str] = None) -> Tuple[bool, str]:
     """
     Fast remote check: install only if codex is missing or npm reports a newer version.
@@ -167,73 +340,35 @@ def ensure_remote_codex_latest(password: Optional[str] = None) -> Tuple[bool, st
     if backend.is_windows():
          return True, "skip (Windows backend)"
 
-    # 1) Cheap existence + version check
-    fast_check = r"""
-if command -v codex >/dev/null 2>&1; then
-    ver=$(codex --version 2>/dev/null)
-    if [ $? -eq 0 ] && [ -n "$ver" ]; then
-        echo "HAS|"${ver}
-        exit 0
-    fi
-    echo "BROKEN"
-    exit 0
-fi
-echo "MISSING"
-"""
-    res = backend.run_as_root(fast_check, password, timeout=6)
-    state_line = (res.stdout or "").strip().splitlines()[:1]
-    state = state_line[0] if state_line else ""
-
-    has_codex = state.startswith("HAS|")
-    current_ver = state.split("|", 1)[1].strip() if has_codex else ""
-
-    # 2) Quick latest lookup (if npm exists); timeout to avoid hanging
-    needs_install = False
+    # 1) Existence, version, npm presence and latest npm version in one round-trip.
+    # A recent "up to date" answer for this target skips the npm registry lookup.
+    cache_key = backend.backend_description()
+    cached = _fresh_update_entry(cache_key)
+    probe = probe_codex(password, as_root=True, with_npm=not cached)
+    has_codex = probe.codex_ok and bool(probe.codex_version)
+    current_ver = probe.codex_version if has_codex else ""
+    if has_codex and cached:
+        if cached.get("current_ver") == current_ver:
+            return True, f"Codex present ({current_ver})"
+        # Version changed behind our back; ask npm after all.
+        probe = probe_codex(password, as_root=True, with_npm=True)
+
+    # 2) Compare with the latest published version (only looked up when codex works)
+    needs_install = not has_codex
     needs_update = False
-    latest_ver = ""
-    npm_check = r"""
-if command -v npm >/dev/null 2>&1; then
-    if command -v timeout >/dev/null 2>&1; then
-        timeout 3s npm view @openai/codex version 2>/dev/null
-    else
-        npm view @openai/codex version 2>/dev/null
-    fi
-fi
-"""
-    if has_codex:
-        latest_res = backend.run_as_root(npm_check, password, timeout=6)
-        latest_ver = (latest_res.stdout or "").strip().splitlines()[:1]
-        latest_ver = latest_ver[0] if latest_ver else ""
-        if latest_ver and latest_ver not in current_ver:
-            needs_update = True
-    else:
-        needs_install = True
+    latest_ver = probe.npm_version
+    if has_codex and latest_ver and latest_ver not in current_ver:
+        needs_update = True
 
     if has_codex and not needs_update:
+        if latest_ver:
+            _save_update_cache(cache_key, current_ver=current_ver, latest_ver=latest_ver)
         return True, f"Codex present ({current_ver})"
 
     # 3) Ensure npm only if we actually need install/update
     if needs_install or needs_update:
-        npm_exists = backend.run_as_root("command -v npm >/dev/null 2>&1", password, timeout=5).ok
-        if not npm_exists:
-            os_name = backend.detect_os().lower()
-            if "debian" in os_name or "ubuntu" in os_name or "kali" in os_name or "mint" in os_name or "pop" in os_name:
-                pkg_cmd = "apt-get update -qq && apt-get install -y -qq nodejs npm"
-            elif "fedora" in os_name or "red hat" in os_name or "rhel" in os_name or "centos" in os_name or "amzn" in os_name or "alma" in os_name or "rocky" in os_name or "oracle" in os_name:
-                pkg_cmd = "if command -v dnf >/dev/null; then dnf install -y -q nodejs npm; else yum install -y -q nodejs npm; fi"
-            elif "arch" in os_name or "manjaro" in os_name or "endeavour" in os_name:
-                 pkg_cmd = "pacman -Sy --noconfirm nodejs npm"
-            elif "darwin" in os_name:
-                pkg_cmd = "brew install node"
-            else:
-                pkg_cmd = (
-                    "if command -v apt-get >/dev/null; then apt-get update -qq && apt-get install -y -qq nodejs npm; "
-                    "elif command -v dnf >/dev/null; then dnf install -y -q nodejs npm; "
-                    "elif command -v yum >/dev/null; then yum install -y -q nodejs npm; "
-                    "elif command -v pacman >/dev/null; then pacman -Sy --noconfirm nodejs npm; "
-                    "elif command -v brew >/dev/null; then brew install node; "
-                    "else echo 'ERROR|Package manager not found'; exit 1; fi"
-                )
+        if not probe.npm_path:
+            pkg_cmd = _npm_install_command(backend.detect_os())
             got_npm = backend.run_as_root(pkg_cmd, password, timeout=180)
             if not got_npm.ok:
                 return False, (got_npm.stderr or got_npm.stdout or "npm install failed").strip()
@@ -249,8 +384,12 @@ fi
 
         # 5) Verify
         verify = backend.run_as_root("codex --version", password, timeout=10)
-        if verify.ok and verify.stdout:
-            return True, f"Codex {mode}ed: {verify.stdout.strip()}"
+        installed_ver = parsing.first_line(verify.stdout)
+        if verify.ok and installed_ver:
+            invalidate_help_cache()
+            if latest_ver:
+                _save_update_cache(cache_key, current_ver=installed_ver, latest_ver=latest_ver)
+            return True, f"Codex {mode}ed: {installed_ver}"
         return False, (verify.stderr or verify.stdout or "codex verify failed").strip()
 
     return True, "No action taken"
@@ -263,11 +402,12 @@ def ensure_windows_codex_latest() -> Tuple[bool, str]:
     ok, tag, url = _windows_latest_release()
     if not ok or not url:
         return False, f"Failed to query latest release: {url or '(unknown)'}"
-    current = _current_codex_version()
+    probe = probe_codex()
+    current = _current_codex_version(probe)
     if current and tag.lstrip("v") == current.lstrip("v"):
         return True, f"Codex already latest ({current})"
     
-    existing = _find_windows_codex_path()
+    existing = probe.codex_path
     if existing:
         dest = existing
         install_dir = str(Path(dest).parent)
@@ -292,16 +432,33 @@ def ensure_windows_codex_latest() -> Tuple[bool, str]:
     )
     res = backend.run_shell(script)
     if res.ok:
+        invalidate_codex_path_cache()
+        invalidate_help_cache()
         # Ensure current process sees the new binary
-        if install_dir.lower() not in [p.lower() for p in os.environ["PATH"].split(os.pathsep)]:
+        install_dir_lower = install_dir.lower()
+        if not any(p.lower() == install_dir_lower for p in os.environ["PATH"].split(os.pathsep)):
             os.environ["PATH"] += os.pathsep + install_dir
         return True, (res.stdout or "").strip() or f"Updated to {tag}"
     return False, (res.stderr or res.stdout or "Download failed").strip()
 
 
+def _recently_modified(*paths: Path) -> bool:
+    cutoff = time.time() - settings.AUTH_TRUST_SECONDS
+    for path in paths:
+        try:
+            if path.stat().st_mtime >= cutoff:
+                return True
+        except OSError:
+            continue
+    return False
+
+
 def ensure_codex_authenticated(prompt_fn: Callable[[], Optional[Dict[str, str]]]) -> Tuple[bool, str]:
     """Ensure codex is authenticated; prompt user if not."""
     home_dot_codex = Path.home() / ".codex"
+    # Recently touched credentials/config are trusted without paying for a codex startup.
+    if _recently_modified(home_dot_codex / "auth.json", home_dot_codex / "config.toml"):
+        return True, f"Using existing config at {home_dot_codex}; skipping login prompt."
     status = backend.run_shell("codex auth status")
     if status.ok and "Authenticated" in (status.stdout or ""):
         return True, (status.stdout or "").strip()
@@ -333,55 +490,83 @@ def ensure_codex_authenticated(prompt_fn: Callable[[], Optional[Dict[str, str]]]
     return False, "Unknown auth method."
 
 
-def list_session_files(password: Optional[str]) -> List[Tuple[float, str]]:
-    if backend.is_windows():
-        base = settings.DEFAULT_WINDOWS_CONVERSATION_DIR
-        entries: List[Tuple[float, str]] = []
-        import os
-
-        for root, _dirs, files in os.walk(base):
-            for name in files:
-                if not name.lower().endswith((".json", ".jsonl")):
-                    continue
-                path = os.path.join(root, name)
-                try:
-                    ts = os.path.getmtime(path)
-                except OSError:
-                    continue
-                entries.append((ts, path))
-        entries.sort(key=lambda item: item[0], reverse=True)
-        return entries[:200]
+def _list_remote_sessions(password: Optional[str], since: str = "") -> Tuple[Optional[List[Tuple[float, str]]], str]:
+    """Return (newest session files, target clock stamp); files is None when nothing changed since `since`."""
     script = (
         "dir=$HOME/.codex/sessions; "
+        "echo \"STAMP|$(date +%s)\"; "
+        f"since={backend.bash_single_quote(since)}; "
+        "if [ -n \"$since\" ] && [ -d \"$dir\" ] && "
+        "[ -z \"$(find \"$dir\" -maxdepth 5 -newermt \"@$since\" -print -quit 2>/dev/null)\" ]; then "
+        "echo UNCHANGED; exit 0; "
+        "fi; "
         "if [ -d \"$dir\" ]; then "
         "find \"$dir\" -maxdepth 5 -type f -printf '%T@\\t%p\\n' 2>/dev/null | "
         "sort -nr | head -n 200; "
         "fi"
     )
     cmd = f"bash -lc {backend.bash_single_quote(script)}"
-    result = backend.run_as_root(cmd, password, timeout=30)
-    if not result.ok:
-        return []
-
     entries: List[Tuple[float, str]] = []
-    for raw in result.stdout.splitlines():
+    state = {"stamp": "", "unchanged": False}
+
+    def _on_line(raw: str) -> None:
         line = raw.strip()
         if not line:
-            continue
+            return
+        ts_str, sep, path = line.partition('\t')
+        if not sep:
+            if line.startswith("STAMP|"):
+                state["stamp"] = line[len("STAMP|"):]
+            elif line == "UNCHANGED":
+                state["unchanged"] = True
+            return
         try:
-            ts_str, path = line.split('\t', 1)
             ts = float(ts_str)
         except ValueError:
-            continue
+            return
         entries.append((ts, path.strip()))
-    return entries
+
+    result = backend.stream_as_root_lines(cmd, password, 30, _on_line)
+    if not result.ok:
+        return [], ""
+    if state["unchanged"]:
+        return None, state["stamp"]
+    return entries, state["stamp"]
+
+
+def list_session_files(password: Optional[str]) -> List[Tuple[float, str]]:
+    if backend.is_windows():
+        # DirEntry.stat() reuses the directory listing's timestamps on Windows; keep only the newest 200.
+        files = history.scan_files_with_mtime(settings.DEFAULT_WINDOWS_CONVERSATION_DIR, (".json", ".jsonl"), 4)
+        return heapq.nlargest(200, files)
+    entries, _stamp = _list_remote_sessions(password)
+    return entries or []
+
+
+# Last remote snapshot: target description, target-clock stamp of that scan, and path -> mtime.
+_snap_cache: Dict[str, object] = {"target": "", "stamp": "", "snapshot": {}}
 
 
 def session_snapshot(password: Optional[str]) -> Dict[str, float]:
-    snapshot: Dict[str, float] = {}
-    for ts, path in list_session_files(password):
-        snapshot[path] = ts
-    return snapshot
+    if backend.is_windows():
+        # The local scandir walk is already cheap; nothing to save by caching it.
+        return {path: ts for ts, path in list_session_files(password)}
+
+    target = backend.backend_description()
+    since = ""
+    if _snap_cache["target"] == target and _snap_cache["stamp"]:
+        # One second of slack: -newermt is strict and mtimes may share the stamp's second.
+        try:
+            since = str(int(str(_snap_cache["stamp"])) - 1)
+        except ValueError:
+            since = ""
+    entries, stamp = _list_remote_sessions(password, since)
+    if entries is None:
+        return dict(_snap_cache["snapshot"])  # type: ignore[arg-type]
+
+    snapshot = {path: ts for ts, path in entries}
+    _snap_cache.update(target=target, stamp=stamp, snapshot=snapshot)
+    return dict(snapshot)
 
 
 def session_id_from_path(path: str) -> Optional[str]:
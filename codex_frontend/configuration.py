@@ -1,12 +1,40 @@
 """Root configuration read/write helpers."""
 from __future__ import annotations
 
+import io
 from typing import List, Optional, Tuple
 from pathlib import Path
 
 from . import settings, backend
 
 
+_TOML_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r", "\t": "\\t"})
+
+
+def toml_quote(value: str) -> str:
+    """Return value as a TOML basic string (quotes, backslashes and newlines escaped)."""
+    return '"' + value.translate(_TOML_ESCAPES) + '"'
+
+
+def toml_unquote(value: str) -> str:
+    """Inverse of toml_quote for the simple one-line strings this module writes."""
+    value = value.strip()
+    if len(value) < 2 or not (value.startswith('"') and value.endswith('"')):
+        return value.strip('"')
+    inner = value[1:-1]
+    if "\\" not in inner:
+        return inner
+    out = io.StringIO()
+    chars = iter(inner)
+    for ch in chars:
+        if ch == "\\":
+            nxt = next(chars, "")
+            out.write({"n": "\n", "r": "\r", "t": "\t"}.get(nxt, nxt))
+        else:
+            out.write(ch)
+    return out.getvalue()
+
+
 def build_config_toml(
     model: Optional[str],
     approval_policy: str,
@@ -16,28 +44,24 @@ def build_config_toml(
     intelligence: Optional[str] = None,
     reasoning_level: Optional[str] = None,
 ) -> str:
-    lines = []
+    buf = io.StringIO()
+    w = buf.write
     if model:
-        lines.append(f'model = "{model}"')
+        w(f"model = {toml_quote(model)}\n")
     if intelligence:
-        lines.append(f'intelligence = "{intelligence}"')
+        w(f"intelligence = {toml_quote(intelligence)}\n")
     if reasoning_level:
-        lines.append(f'reasoning_level = "{reasoning_level}"')
-    lines.append(f'approval_policy = "{approval_policy}"')
-    lines.append(f'sandbox_mode = "{sandbox_mode}"')
+        w(f"reasoning_level = {toml_quote(reasoning_level)}\n")
+    w(f"approval_policy = {toml_quote(approval_policy)}\n")
+    w(f"sandbox_mode = {toml_quote(sandbox_mode)}\n")
     if web_search:
-        lines.append("")
-        lines.append("[tools]")
-        lines.append("web_search = true")
-    if trust_paths:
-        for path in trust_paths:
-            clean = path.strip()
-            if not clean:
-                continue
-            lines.append("")
-            lines.append(f'[projects."{clean}"]')
-            lines.append('trust_level = "trusted"')
-    return "\n".join(lines) + "\n"
+        w("\n[tools]\nweb_search = true\n")
+    for path in trust_paths or ():
+        clean = path.strip()
+        if not clean:
+            continue
+        w(f'\n[projects.{toml_quote(clean)}]\ntrust_level = "trusted"\n')
+    return buf.getvalue()
 
 
 def apply_config_as_root(
@@ -73,14 +97,13 @@ def apply_config_as_root(
         intelligence,
         reasoning_level,
     )
+    # The TOML travels on stdin so its contents never pass through shell parsing.
     cmd = (
         "install -m 700 -d ~/.codex && "
-        "cat > ~/.codex/config.toml <<'EOF'\n"
-        f"{content}"
-        "EOF\n"
+        "(umask 077; cat > ~/.codex/config.toml) && "
         "chmod 600 ~/.codex/config.toml && echo OK"
     )
-    result = backend.run_as_root(cmd, password, timeout=60)
+    result = backend.run_as_root(cmd, password, timeout=60, input_text=content)
     if result.ok and "OK" in result.stdout:
         return True, "config.toml written for root user."
     return False, f"failed to write config.toml: rc={result.code} out={result.stdout.strip()} err={result.stderr.strip()}"
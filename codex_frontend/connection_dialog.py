@@ -12,21 +12,12 @@ class ConnectionDialog(wx.Dialog):
 
         modes = ["Local Windows (default)", "Local WSL", "Remote SSH"]
         self.mode_choices = modes
-        current_mode = initial.get("mode", "windows")
-        selection = 0
-        if current_mode == "wsl":
-            selection = 1
-        elif current_mode == "remote":
-            selection = 2
 
         self.mode_radio = wx.RadioBox(self, label="Backend", choices=modes, majorDimension=1, style=wx.RA_SPECIFY_ROWS)
-        self.mode_radio.SetSelection(selection)
-
-        self.host_txt = wx.TextCtrl(self, value=initial.get("host", ""))
-        self.port_txt = wx.SpinCtrl(self, min=1, max=65535, initial=int(initial.get("port", 22)))
-        self.user_txt = wx.TextCtrl(self, value=initial.get("username", "root"))
+        self.host_txt = wx.TextCtrl(self)
+        self.port_txt = wx.SpinCtrl(self, min=1, max=65535, initial=22)
+        self.user_txt = wx.TextCtrl(self)
         self.pass_txt = wx.TextCtrl(self, style=wx.TE_PASSWORD)
-        self.pass_txt.SetValue(initial.get("password", ""))
 
         form = wx.FlexGridSizer(4, 2, 6, 6)
         form.Add(wx.StaticText(self, label="Host"), 0, wx.ALIGN_CENTER_VERTICAL)
@@ -48,6 +39,20 @@ class ConnectionDialog(wx.Dialog):
         self.SetSizerAndFit(layout)
 
         self.mode_radio.Bind(wx.EVT_RADIOBOX, self._on_mode_change)
+        self.set_values(initial)
+
+    def set_values(self, initial: Dict[str, Any]) -> None:
+        current_mode = initial.get("mode", "windows")
+        selection = 0
+        if current_mode == "wsl":
+            selection = 1
+        elif current_mode == "remote":
+            selection = 2
+        self.mode_radio.SetSelection(selection)
+        self.host_txt.ChangeValue(initial.get("host", ""))
+        self.port_txt.SetValue(int(initial.get("port", 22)))
+        self.user_txt.ChangeValue(initial.get("username", "root"))
+        self.pass_txt.ChangeValue(initial.get("password", ""))
         self._on_mode_change(None)
 
     def _on_mode_change(self, _evt):
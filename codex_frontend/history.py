@@ -1,114 +1,282 @@
 """Conversation history utilities."""
 from __future__ import annotations
 
+import atexit
+import heapq
+import io
+import re
+import threading
 import time
-from typing import List, Optional, Tuple
+import uuid
+from collections import OrderedDict
+from operator import itemgetter
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import os
 from pathlib import Path
 
-from . import settings, backend
+from . import settings, backend, parsing, win_find
+
+_HISTORY_DIR_SET = frozenset(settings.HISTORY_INCLUDE_DIR_NAMES)
+_HISTORY_SUFFIXES = tuple(settings.HISTORY_INCLUDE_SUFFIXES)
+_HISTORY_SUFFIX_WINDOW = max(map(len, _HISTORY_SUFFIXES))
+# Base prefixes stripped before looking for include-directory names.
+_ROOT_CODEX_PREFIX = "/root/.codex/"
+_WSL_BASE = settings.DEFAULT_WSL_CONVERSATION_DIR.rstrip("/")
+_WSL_PREFIX = _WSL_BASE + "/" if _WSL_BASE else ""
+_WIN_BASE = settings.DEFAULT_WINDOWS_CONVERSATION_DIR
+_WIN_PREFIX_LOWER = _WIN_BASE.lower() + "\\" if _WIN_BASE else ""
+# find(1) predicates equivalent to the suffix/directory filter, so WSL/SSH listings arrive pre-filtered.
+_FIND_HISTORY_FILTER = (
+    "\\( " + " -o ".join(f"-iname '*{suffix}'" for suffix in _HISTORY_SUFFIXES) + " \\) "
+    "\\( " + " -o ".join(f"-ipath '*/{name}/*'" for name in settings.HISTORY_INCLUDE_DIR_NAMES) + " \\)"
+)
+
+# The newest few small history files ride along with the WSL/SSH listing so opening
+# one right after a refresh needs no second root round-trip.
+PREFETCH_COUNT = 20
+PREFETCH_MAX_BYTES = 16 * 1024
+PREFETCH_TTL_SECONDS = 30.0
+_PREFETCH_MARK = f"__CODEX_PREFETCH_{uuid.uuid4().hex}__"
+# path -> (time.monotonic() when the listing started, file text)
+_prefetched: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+# path -> time.monotonic() of the last change made here. A listing can run on another
+# thread while a conversation is appended to, so text listed before that change is stale.
+_changed_at: Dict[str, float] = {}
+
+# Everything except what rename keeps: \w is exactly str.isalnum() plus "_", and the
+# regex engine drops the rest in C instead of a per-character Python generator.
+_UNSAFE_NAME_CHARS = re.compile(r"[^\w .-]")
+
+# Windows keeps the most recently appended conversation files open; opening a file
+# there costs far more than the write itself. Least recently used handles are closed first.
+APPEND_HANDLE_LIMIT = 8
+_append_handles: "OrderedDict[str, io.TextIOWrapper]" = OrderedDict()
+_append_lock = threading.Lock()
+
+
+def _append_local(path: str, payload: str) -> None:
+    with _append_lock:
+        handle = _append_handles.pop(path, None)
+        if handle is None:
+            handle = open(path, "a", encoding="utf-8", buffering=8192)
+        try:
+            handle.write(payload)
+            handle.flush()
+        except OSError:
+            handle.close()
+            raise
+        _append_handles[path] = handle
+        while len(_append_handles) > APPEND_HANDLE_LIMIT:
+            _append_handles.popitem(last=False)[1].close()
+
+
+def _close_append_handle(path: str) -> None:
+    with _append_lock:
+        handle = _append_handles.pop(path, None)
+    if handle is not None:
+        handle.close()
+
+
+@atexit.register
+def _close_append_handles() -> None:
+    with _append_lock:
+        while _append_handles:
+            _append_handles.popitem()[1].close()
 
 
 def _is_conversation_history(path: str) -> bool:
     if not path:
         return False
-    rel = path
-    if rel.startswith("/root/.codex/"):
-        rel = rel[len("/root/.codex/") :]
-    default_base = settings.DEFAULT_WSL_CONVERSATION_DIR.rstrip("/")
-    if default_base and rel.startswith(default_base + "/"):
-        rel = rel[len(default_base) + 1 :]
-    win_base = settings.DEFAULT_WINDOWS_CONVERSATION_DIR
-    if win_base and rel.lower().startswith(win_base.lower() + "\\"):
-        rel = rel[len(win_base) + 1 :]
-    rel_lower = rel.lower().replace("\\", "/")
-    parts = rel_lower.split('/')
-    if not any(name in parts for name in settings.HISTORY_INCLUDE_DIR_NAMES):
+    # Suffix test first: it rejects most entries without touching the rest of the path.
+    if not path[-_HISTORY_SUFFIX_WINDOW:].lower().endswith(_HISTORY_SUFFIXES):
         return False
-    if not rel_lower.endswith(settings.HISTORY_INCLUDE_SUFFIXES):
-        return False
-    return True
+    rel = path
+    if rel.startswith(_ROOT_CODEX_PREFIX):
+        rel = rel[len(_ROOT_CODEX_PREFIX) :]
+    if _WSL_PREFIX and rel.startswith(_WSL_PREFIX):
+        rel = rel[len(_WSL_PREFIX) :]
+    if _WIN_PREFIX_LOWER and rel[: len(_WIN_PREFIX_LOWER)].lower() == _WIN_PREFIX_LOWER:
+        rel = rel[len(_WIN_PREFIX_LOWER) :]
+    # Only the directories below the base matter and the walks stop at depth 5.
+    parts = rel.lower().replace("\\", "/").rsplit("/", 6)[:-1]
+    return not _HISTORY_DIR_SET.isdisjoint(parts)
+
+
+def scan_files_with_mtime(base: str, suffixes: Tuple[str, ...], max_depth: int) -> Iterator[Tuple[float, str]]:
+    """Yield (mtime, path) for matching files under base, descending at most max_depth directories.
+
+    On Windows this reads names and timestamps straight from FindFirstFileExW
+    batches (see win_find); elsewhere it uses os.scandir, stat'ing each entry once.
+    """
+    if win_find.AVAILABLE:
+        yield from win_find.scan_files_with_mtime(base, suffixes, max_depth)
+        return
+    # Explicit stack instead of recursion: items are not relayed through one generator per level.
+    stack: List[Tuple[str, int]] = [(base, 0)]
+    while stack:
+        path, depth = stack.pop()
+        try:
+            it = os.scandir(path)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if depth < max_depth:
+                            stack.append((entry.path, depth + 1))
+                    elif entry.name.lower().endswith(suffixes):
+                        yield entry.stat(follow_symlinks=False).st_mtime, entry.path
+                except OSError:
+                    continue
+
+
+def _local_path(path: str) -> str:
+    """Return a path this process can open directly, or "" when the file lives on the backend host."""
+    if backend.is_windows():
+        return path
+    if backend.is_wsl() and os.name == "nt":
+        # /mnt/<drive>/... under WSL is an ordinary Windows file.
+        return settings.wsl_to_windows_path(path)
+    return ""
 
 
 def _bash_assign_path(var: str, path: str) -> str:
     q_path = backend.bash_single_quote(path)
-    # A simplified and more robust way to handle path assignment and tilde expansion.
+    command = f"{var}={q_path}"
+    if not path.startswith("~/"):
+        # Absolute/relative paths need no home lookup; keep the script a plain assignment.
+        return command
+    # ~/ means the invoking user's home, even under sudo, so resolve it on the target.
     # We construct the shell variable slicing carefully to avoid f-string interpretation.
-    command = f"{var}={q_path}; "
-    command += f"if [[ \"${var}\" == '~/'* ]]; then "
+    command += "; "
     command += 'home_dir=""; '
     command += 'if [ -n "$SUDO_USER" ]; then home_dir=$(getent passwd "$SUDO_USER" | cut -d: -f6); fi; '
     command += 'if [ -z "$home_dir" ]; then home_dir="$HOME"; fi; '
-    command += var + '="$home_dir/${' + var + ':2}"; '
-    command += "fi"
+    command += var + '="$home_dir/${' + var + ':2}"'
     return command
 
 
-def list_codex_history(password: Optional[str], base_dir: str) -> Tuple[List[str], Optional[str]]:
+def _newest_first(entries: List[Tuple[float, str]], limit: Optional[int]) -> List[str]:
+    if limit:
+        # Only the newest `limit` entries are kept: O(N log K) instead of a full sort.
+        return [p for _, p in heapq.nlargest(limit, entries, key=itemgetter(0))]
+    entries.sort(key=itemgetter(0), reverse=True)
+    return [p for _, p in entries]
+
+
+def list_codex_history(
+    password: Optional[str], base_dir: str, create: bool = False, limit: Optional[int] = None
+) -> Tuple[List[str], Optional[str]]:
     if not base_dir:
         return [], "conversation directory not set"
 
     if backend.is_windows():
-        entries: List[Tuple[float, str]] = []
-        for root, _dirs, files in os.walk(base_dir):
-            depth = Path(root).relative_to(Path(base_dir)).parts
-            if len(depth) > 4:
-                continue
-            for name in files:
-                if not name.lower().endswith(settings.HISTORY_INCLUDE_SUFFIXES):
-                    continue
-                path = os.path.join(root, name)
-                try:
-                    ts = os.path.getmtime(path)
-                except OSError:
-                    continue
-                entries.append((ts, path))
-        if not entries:
-            return [], None
-        entries.sort(key=lambda item: item[0], reverse=True)
-        filtered = [p for _, p in entries if _is_conversation_history(p)]
-        return (filtered or [p for _, p in entries], None)
+        if create:
+            try:
+                Path(base_dir).mkdir(parents=True, exist_ok=True)
+            except OSError as exc:
+                return [], str(exc)
+        entries = list(scan_files_with_mtime(base_dir, _HISTORY_SUFFIXES, 4))
+        # Filter before sorting and sort only the list that is returned; like the find
+        # script, fall back to every scanned file when none sit in a history directory.
+        chosen = [item for item in entries if _is_conversation_history(item[1])] or entries
+        return _newest_first(chosen, limit), None
 
+    # find applies the history filters itself; only when nothing matches does it list every file.
+    # The listing is also kept in a temp file so the newest small files can be appended after it.
+    # Records are NUL-terminated so any path survives, newlines included.
     script = (
         _bash_assign_path("dir", base_dir)
-        + "; if [ -d \"$dir\" ]; then find \"$dir\" -maxdepth 4 -type f -printf '%T@\\t%p\\n' 2>/dev/null; fi"
+        + ("; mkdir -p \"$dir\" || exit 1" if create else "")
+        + "; if [ -d \"$dir\" ]; then "
+        "tmp=$(mktemp) || exit 1; "
+        f"find \"$dir\" -maxdepth 4 -type f {_FIND_HISTORY_FILTER} -printf '%T@\\t%p\\0' 2>/dev/null | "
+        "{ if IFS= read -r -d '' first; then printf '%s\\0' \"$first\"; cat; "
+        "else find \"$dir\" -maxdepth 4 -type f -printf '%T@\\t%p\\0' 2>/dev/null; fi; } | "
+        + (f"sort -z -nr | head -z -n {int(limit)} | " if limit else "")
+        + "tee \"$tmp\"; "
+        "rc=${PIPESTATUS[1]}; "
+        f"sort -z -nr \"$tmp\" | head -z -n {PREFETCH_COUNT} | while IFS=$'\\t' read -r -d '' ts p; do "
+        f"if [ \"$(stat -c %s \"$p\" 2>/dev/null || echo {PREFETCH_MAX_BYTES + 1})\" -le {PREFETCH_MAX_BYTES} ]; then "
+        f"printf '%s\\t%s\\0' {_PREFETCH_MARK} \"$p\"; cat \"$p\"; printf '\\0%s\\0' {_PREFETCH_MARK}; "
+        "fi; done; "
+        "rm -f \"$tmp\"; exit $rc; "
+        "fi"
     )
-    # Just pass the script; run_as_root handles wrapping/shell execution
-    result = backend.run_as_root(script, password, timeout=60)
-    if not result.ok:
-        err = (result.stderr or result.stdout or "").strip() or f"find failed (rc={result.code})"
-        return [], err
-
     entries: List[Tuple[float, str]] = []
-    for raw in result.stdout.splitlines():
-        line = raw.strip()
-        if not line:
-            continue
+    prefetch_path: Optional[str] = None
+    prefetch_parts: List[str] = []
+    listed_at = time.monotonic()
+    _prefetched.clear()
+    for path, changed in list(_changed_at.items()):
+        if listed_at - changed > PREFETCH_TTL_SECONDS:
+            _changed_at.pop(path, None)
+
+    def _on_record(raw: str) -> None:
+        nonlocal prefetch_path
+        if prefetch_path is not None:
+            # File text runs until the closing mark, even if it contains NULs of its own.
+            if raw == _PREFETCH_MARK:
+                _prefetched[prefetch_path] = (listed_at, "\0".join(prefetch_parts).strip())
+                prefetch_path = None
+                prefetch_parts.clear()
+            else:
+                prefetch_parts.append(raw)
+            return
+        if raw.startswith(_PREFETCH_MARK + "\t"):
+            prefetch_path = raw[len(_PREFETCH_MARK) + 1 :]
+            return
+        # float() ignores surrounding whitespace itself; the path is taken verbatim.
+        ts_str, sep, path = raw.partition("\t")
+        if not sep:
+            return
         try:
-            ts_str, path = line.split('\t', 1)
             ts = float(ts_str)
         except ValueError:
-            continue
-        entries.append((ts, path.strip()))
+            return
+        entries.append((ts, path))
+
+    # Parse find's output while it streams in rather than splitting one large stdout blob afterwards.
+    result = backend.stream_as_root_lines(script, password, 60, _on_record, sep="\0")
+    if not result.ok:
+        err = (result.stderr or result.stdout or "").strip() or f"find failed (rc={result.code})"
+        return [], err
 
     if not entries:
         return [], None
 
-    entries.sort(key=lambda item: item[0], reverse=True)
-    filtered = [path for _, path in entries if _is_conversation_history(path)]
-    if filtered:
-        return filtered, None
-    return [path for _, path in entries], None
+    return _newest_first(entries, limit), None
+
+
+def _take_prefetched(path: str) -> Optional[str]:
+    hit = _prefetched.pop(path, None)
+    if hit is None or time.monotonic() - hit[0] > PREFETCH_TTL_SECONDS:
+        return None
+    if hit[0] <= _changed_at.get(path, float("-inf")):
+        return None
+    return hit[1]
+
+
+def _forget_prefetched(path: str) -> None:
+    _changed_at[path] = time.monotonic()
+    _prefetched.pop(path, None)
 
 
 def read_history_file(path: str, password: Optional[str]) -> str:
-    if backend.is_windows():
+    cached = _take_prefetched(path)
+    if cached is not None:
+        return cached
+    local = _local_path(path)
+    if local:
         try:
-            return Path(path).read_text(encoding="utf-8", errors="replace")
+            return Path(local).read_text(encoding="utf-8", errors="replace")
         except OSError as exc:
-            return f"not found ({exc})"
-    
+            if backend.is_windows():
+                return f"not found ({exc})"
+        # Fall back to the backend shell (e.g. the file is only readable as root).
+
     # For reading, we just cat the file. The path comes from list_codex_history 
     # which returns absolute paths (from find), so expansion shouldn't be needed here usually.
     # However, to be safe against ~ passed directly:
@@ -143,10 +311,13 @@ def ensure_conversation_dir(password: Optional[str], base_dir: str) -> Tuple[boo
 
 
 def create_new_conversation(password: Optional[str], base_dir: str) -> Tuple[bool, str]:
-    ok, msg = ensure_conversation_dir(password, base_dir)
-    if not ok:
-        return False, msg
+    if not base_dir:
+        return False, "conversation directory not set"
     if backend.is_windows():
+        try:
+            Path(base_dir).mkdir(parents=True, exist_ok=True)
+        except OSError as exc:
+            return False, str(exc)
         stamp = time.strftime("%Y%m%dT%H%M%S")
         base_path = Path(base_dir)
         path = base_path / f"conversation_{stamp}.md"
@@ -162,64 +333,107 @@ def create_new_conversation(password: Optional[str], base_dir: str) -> Tuple[boo
     
     script = (
         _bash_assign_path("dir", base_dir)
-        + "; stamp=$(date +%Y%m%dT%H%M%S); "
-        "file=\"$dir/conversation_${stamp}.md\"; "
-        "while [ -e \"$file\" ]; do stamp=$(date +%Y%m%dT%H%M%S_%N); file=\"$dir/conversation_${stamp}.md\"; done; "
+        # mkdir and mktemp share the round-trip; mktemp picks a free name atomically, no retry loop.
+        + "; mkdir -p \"$dir\" || exit 1; "
+        "file=$(mktemp \"$dir/conversation_$(date +%Y%m%dT%H%M%S)_XXXXXX.md\") || exit 1; "
         "printf '# Conversation started %s\\n\\n' \"$(date -Iseconds)\" > \"$file\" || exit 1; "
         "printf '%s\\n' \"$file\""
     )
     result = backend.run_as_root(script, password, timeout=30)
     if not result.ok:
         return False, (result.stderr or result.stdout or f"rc={result.code}").strip()
-    out = (result.stdout or "").strip()
-    path = out.splitlines()[-1] if out else ""
+    path = parsing.last_line(result.stdout)
     if not path:
         return False, "conversation path missing"
     return True, path
 
 
-def append_conversation_entry(
-    path: str,
-    prompt: str,
-    stdout: str,
-    stderr: str,
-    password: Optional[str],
-) -> Tuple[bool, str]:
+def _format_entry(prompt: str, stdout: str, stderr: str) -> str:
     timestamp = time.strftime("%Y-%m-%d %H:%M:%S %Z")
-    parts = [
-        f"## Prompt ({timestamp})",
-        prompt or "(empty)",
-        "",
-    ]
+    # Written straight into one buffer rather than collected in a list and joined.
+    buf = io.StringIO()
+    buf.write(f"## Prompt ({timestamp})\n{prompt or '(empty)'}\n\n")
     clean_stdout = stdout.rstrip("\n")
     clean_stderr = stderr.rstrip("\n")
     if clean_stdout:
-        parts.extend(["### Output", clean_stdout, ""])
+        buf.write(f"### Output\n{clean_stdout}\n\n")
     if clean_stderr:
-        parts.extend(["### Stderr", clean_stderr, ""])
+        buf.write(f"### Stderr\n{clean_stderr}\n\n")
+    return buf.getvalue()
+
 
-    payload = "\n".join(parts) + "\n"
+def _append_entry(path: str, payload: str, password: Optional[str], read_back: bool) -> Tuple[bool, str, str]:
+    _forget_prefetched(path)
     if backend.is_windows():
         try:
-            with Path(path).open("a", encoding="utf-8") as fh:
-                fh.write(payload)
-            return True, "appended conversation entry"
+            _append_local(path, payload)
+            text = Path(path).read_text(encoding="utf-8", errors="replace") if read_back else ""
+            return True, "appended conversation entry", text
         except OSError as exc:
-            return False, str(exc)
-            
-    # payload needs separate quoting as it's content
-    payload_quoted = backend.bash_single_quote(payload)
-    
+            return False, str(exc), ""
+
+    local = _local_path(path)
+    if local:
+        # A WSL file on a Windows drive: one O_APPEND write(), no sudo round-trip.
+        # O_BINARY keeps Windows from rewriting \n as \r\n; no O_CREAT, the file must exist.
+        try:
+            fd = os.open(local, os.O_WRONLY | os.O_APPEND | getattr(os, "O_BINARY", 0))
+        except OSError:
+            fd = -1  # Not writable from this side; let the backend shell do it as root.
+        if fd >= 0:
+            try:
+                os.write(fd, payload.encode("utf-8"))
+            except OSError as exc:
+                return False, str(exc), ""
+            finally:
+                os.close(fd)
+            text = ""
+            if read_back:
+                try:
+                    text = Path(local).read_text(encoding="utf-8", errors="replace").strip()
+                except OSError:
+                    pass
+            return True, "appended conversation entry", text
+
+    # The payload goes over stdin: no quoting, no argv size limit, no second shell parse.
     # path expansion handled by _bash_assign_path
     script = (
         _bash_assign_path("path", path)
         + "; if [ ! -e \"$path\" ]; then exit 1; fi; "
-        f"printf \"%s\" {payload_quoted} >> \"$path\" || exit 1"
+        "cat >> \"$path\" || exit 1"
     )
-    result = backend.run_as_root(script, password, timeout=30)
+    if read_back:
+        script += "; cat \"$path\""
+    result = backend.run_as_root(script, password, timeout=30, input_text=payload)
     if result.ok:
-        return True, "appended conversation entry"
-    return False, (result.stderr or result.stdout or f"rc={result.code}").strip()
+        return True, "appended conversation entry", (result.stdout or "").strip() if read_back else ""
+    return False, (result.stderr or result.stdout or f"rc={result.code}").strip(), ""
+
+
+def append_conversation_entry(
+    path: str,
+    prompt: str,
+    stdout: str,
+    stderr: str,
+    password: Optional[str],
+) -> Tuple[bool, str]:
+    ok, msg, _text = _append_entry(path, _format_entry(prompt, stdout, stderr), password, read_back=False)
+    return ok, msg
+
+
+def append_and_read_conversation(
+    path: str,
+    prompt: str,
+    stdout: str,
+    stderr: str,
+    password: Optional[str],
+) -> Tuple[bool, str, str]:
+    """Append an entry and return the updated file in the same backend call.
+
+    Returns (success, message, file_text); saves the separate read that
+    refreshing the history view would otherwise cost.
+    """
+    return _append_entry(path, _format_entry(prompt, stdout, stderr), password, read_back=True)
 
 
 def rename_conversation_file(
@@ -230,9 +444,12 @@ def rename_conversation_file(
     """Rename a conversation file. Returns (success, new_full_path, error_msg)."""
     if not old_path:
         return False, "", "invalid old path"
+    _forget_prefetched(old_path)
+    # An open append handle would block the rename on Windows.
+    _close_append_handle(old_path)
     
     # Sanitize new filename
-    safe_name = "".join(c for c in new_filename if c.isalnum() or c in (' ', '.', '_', '-')).strip()
+    safe_name = _UNSAFE_NAME_CHARS.sub("", new_filename).strip()
     safe_name = safe_name.replace(" ", "_")
     if not safe_name:
         return False, "", "invalid new filename"
@@ -271,6 +488,6 @@ def rename_conversation_file(
     )
     result = backend.run_as_root(script, password, timeout=30)
     if result.ok:
-        final_path = result.stdout.strip().splitlines()[-1]
+        final_path = parsing.last_line(result.stdout)
         return True, final_path, ""
     return False, "", (result.stderr or result.stdout).strip()
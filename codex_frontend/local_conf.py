@@ -2,28 +2,86 @@
 from __future__ import annotations
 
 import base64
+import copy
+import functools
 import json
 import time
-from typing import Any, Dict, Optional
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
 
 from . import secure_store, settings
 
+try:  # pragma: no cover - optional dependency
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - fallback when orjson missing
+    orjson = None  # type: ignore
 
-def _read_conf() -> Dict[str, Any]:
+
+def _loads(raw: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _dumps(data: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode("utf-8")
+
+
+@functools.lru_cache(maxsize=1)
+def _conf_paths() -> Tuple[Path, Path]:
+    # settings.conf_path() runs a mkdir on every call; resolve it (and the tmp path) once.
     path = settings.conf_path()
+    return path, path.with_suffix(path.suffix + ".tmp")
+
+
+# (st_mtime_ns, st_size) of the file when it was parsed, and the parsed data.
+_conf_cache: Optional[Tuple[Tuple[int, int], Dict[str, Any]]] = None
+
+
+def _read_conf() -> Dict[str, Any]:
+    global _conf_cache
+    path = _conf_paths()[0]
     try:
-        with path.open("r", encoding="utf-8") as fh:
-            return json.load(fh)
+        st = path.stat()
+    except OSError:
+        return {}
+    key = (st.st_mtime_ns, st.st_size)
+    if _conf_cache is not None and _conf_cache[0] == key:
+        # Callers mutate what they get back before writing it, so hand out a copy.
+        return copy.deepcopy(_conf_cache[1])
+    try:
+        data = _loads(path.read_bytes())
     except Exception:
         return {}
+    _conf_cache = (key, data)
+    return copy.deepcopy(data)
 
 
 def _write_conf(data: Dict[str, Any]) -> None:
-    path = settings.conf_path()
-    tmp_path = path.with_suffix(path.suffix + ".tmp")
-    with tmp_path.open("w", encoding="utf-8") as fh:
-        json.dump(data, fh, indent=2)
-    tmp_path.replace(path)
+    global _conf_cache
+    path, tmp_path = _conf_paths()
+    new_bytes = _dumps(data)
+    try:
+        unchanged = path.read_bytes() == new_bytes
+    except OSError:
+        unchanged = False
+    if not unchanged:
+        # No-op saves (e.g. clearing an already-cleared password) skip the write and rename.
+        try:
+            tmp_path.write_bytes(new_bytes)
+        except FileNotFoundError:
+            # The config directory was removed after the paths were cached.
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(new_bytes)
+        tmp_path.replace(path)
+    try:
+        st = path.stat()
+    except OSError:
+        _conf_cache = None
+    else:
+        _conf_cache = ((st.st_mtime_ns, st.st_size), copy.deepcopy(data))
 
 
 def get_saved_password() -> Optional[str]:
@@ -1,18 +1,102 @@
 """Main wxPython frame for the Codex frontend."""
 from __future__ import annotations
 
+import functools
+import io
 import re
-from typing import List, Optional
+import threading
+from types import SimpleNamespace
+from typing import List, Optional, Set
 from pathlib import Path
 
 import wx
 
 from . import backend, local_conf, settings
 from .connection_dialog import ConnectionDialog
-from .parsing import normalize_thinking_text
+from .messages import (
+    NewConversationMsg,
+    OpenHistoryMsg,
+    PipelineMsg,
+    RefreshHistoryMsg,
+    RunCmdMsg,
+    StopMsg,
+    UpdateConversationDirMsg,
+)
+from .parsing import normalize_thinking_text, parse_token_metrics
 from .ui_panels import HistoryPanel, OptionsDialog, RunLogDialog, AuthDialog
 from .worker import Worker
 
+# History labels drop these prefixes (after the conversation directory itself).
+_CODEX_HOME_PREFIX = "/root/.codex/"
+
+
+def _trim_head(items: List[str], limit: int) -> bool:
+    """Drop the oldest entries once items exceeds limit; returns True if anything was dropped.
+
+    A quarter of limit is dropped on top, so the full re-render a trim needs stays rare.
+    """
+    overflow = len(items) - limit
+    if overflow <= 0:
+        return False
+    del items[: overflow + limit // 4]
+    return True
+
+
+def _trim_head_chars(lines: List[str], limit: int) -> None:
+    """Drop the oldest lines so the rest, newline-joined, fits in three quarters of limit.
+
+    The newest line is always kept, however long it is.
+    """
+    budget = limit - limit // 4
+    keep = 0
+    for line in reversed(lines):
+        budget -= len(line) + 1
+        if budget < 0 and keep:
+            break
+        keep += 1
+    del lines[: len(lines) - keep]
+
+
+@functools.lru_cache(maxsize=8)
+def _label_prefix(base: str) -> str:
+    """Forward-slash form of base with exactly one trailing slash ("" for no base)."""
+    base = base.replace("\\", "/")
+    return base.rstrip("/") + "/" if base else ""
+
+
+def _join_log_lines(lines: List[str]) -> str:
+    text = "\n".join(lines)
+    return text + "\n" if text else text
+
+
+class _LogTextDataObject(wx.TextDataObject):
+    """Clipboard text rendered on demand from a snapshot of output-log lines."""
+
+    def __init__(self, lines: List[str]):
+        super().__init__()
+        self._lines = lines
+        self._text: Optional[str] = None
+
+    def _value(self) -> str:
+        if self._text is None:
+            self._text = _join_log_lines(self._lines)
+            self._lines = []
+        return self._text
+
+    def GetTextLength(self) -> int:
+        text = self._value()
+        if wx.Platform == "__WXMSW__":
+            # wxString length on Windows counts UTF-16 units; +1 for the terminator.
+            return len(text.encode("utf-16-le")) // 2 + 1
+        return len(text) + 1
+
+    def GetText(self) -> str:
+        return self._value()
+
+    def SetText(self, strText: str) -> None:
+        self._text = strText
+        self._lines = []
+
 
 class NoFocusPanel(wx.Panel):
     """Panel that refuses keyboard focus to stay out of tab order."""
@@ -25,6 +109,32 @@ class NoFocusPanel(wx.Panel):
 
 
 class MainFrame(wx.Frame):
+    _MENU_IDS = (
+        "new_conversation",
+        "refresh_history",
+        "change_dir",
+        "load_path",
+        "clear_password",
+        "show_password",
+        "options",
+        "connection",
+        "copy_log",
+        "clear_log",
+        "view_run_log",
+        "toggle_thinking",
+        "toggle_tokens",
+    )
+    # Ctrl+key -> menu id name, or the attribute of a button whose id is used.
+    _ACCEL_SPEC = (
+        ("S", "start_btn"),
+        ("T", "stop_btn"),
+        ("R", "run_cmd_btn"),
+        ("C", "copy_log"),
+        ("H", "refresh_history"),
+        ("O", "options"),
+        ("N", "new_conversation"),
+    )
+
     def __init__(self):
         super().__init__(parent=None, title=settings.APP_TITLE, size=(960, 720))
         self.CreateStatusBar()
@@ -37,16 +147,49 @@ class MainFrame(wx.Frame):
         self.token_budget: int = settings.DEFAULT_CONVERSATION_TOKEN_BUDGET
         self.tokens_remaining: Optional[int] = self.token_budget
         self.thinking_history: List[str] = []
+        self._ids: Optional[SimpleNamespace] = None
+        # Control position where the thinking body ends and the status footer begins;
+        # None forces the next update to be a full render.
+        self._thinking_body_end: Optional[int] = None
         self.live_activity_raw: List[str] = []
         self.live_activity_calllater = None
+        # Worker actions that must not be queued twice while one is pending; UI thread only.
+        self._pending_actions: Set[str] = set()
+        # Set while a debounced history refresh is waiting to be posted; UI thread only.
+        self._history_refresh_pending = False
         self.conversation_log_lines: List[str] = []
+        # How many of conversation_log_lines the output box shows; UI thread only.
+        self._log_rendered_count: int = 0
+        # Length of the text those lines produced, so a redundant full render can be skipped.
+        self._log_rendered_chars: int = 0
+        # Streaming updates from the worker are recorded here and applied together by
+        # _flush_ui, so a burst costs one CallAfter and one repaint per control.
+        self._ui_lock = threading.Lock()
+        self._ui_flush_posted: bool = False
+        self._log_dirty: bool = False
+        self._pending_thinking: List[str] = []
+        self._pending_task: Optional[str] = None
+        self._pending_tokens: Optional[str] = None
+        # Last metrics text handed to the labels; identical updates skip the relayout.
+        self._last_metrics_text: Optional[str] = None
+        # Dialogs are built on first use and then hidden between uses; as children of the
+        # frame they are destroyed with it.
         self.options_dialog: Optional[OptionsDialog] = None
-        self.current_run_log_chunks: List[str] = []
-        self.last_run_log: str = ""
+        self._connection_dialog: Optional[ConnectionDialog] = None
+        self._run_log_dialog: Optional[RunLogDialog] = None
+        # Raw stream of the current and the last finished run; chunks are copied into one
+        # growing buffer instead of each being kept alive as its own string.
+        self._run_log_buf = io.StringIO()
+        self._last_run_log_buf = io.StringIO()
         self.status_footer: str = ""
         self.show_tokens: bool = False
         self.show_thinking: bool = True
         self.connection_mode: str = "local"
+        # Mirrors of the active backend, refreshed by _sync_backend_state after each switch.
+        self._is_remote: bool = False
+        self._is_windows: bool = False
+        self._backend_desc: str = ""
+        self._sync_backend_state()
         self.remote_password: Optional[str] = None  # Track remote sudo/SSH password for worker tasks
         self.worker: Optional[Worker] = None
         self.conversation_has_been_labeled: bool = False # New flag
@@ -82,11 +225,11 @@ class MainFrame(wx.Frame):
         self.save_pw_cb = wx.CheckBox(self.chat_panel, label="Save password to conf file")
         self.save_pw_cb.SetName("Save password checkbox")
         
-        pwd_row = wx.BoxSizer(wx.HORIZONTAL)
-        pwd_row.Add(pwd_lbl, 0, wx.ALIGN_CENTER_VERTICAL | wx.RIGHT, 6)
-        pwd_row.Add(self.pwd_tc, 1, wx.ALIGN_CENTER_VERTICAL)
-        pwd_row.Add(self.save_pw_cb, 0, wx.LEFT | wx.ALIGN_CENTER_VERTICAL, 8)
-        top_controls_sizer.Add(pwd_row, 0, wx.EXPAND | wx.LEFT | wx.RIGHT | wx.BOTTOM, 6)
+        self.pwd_row = wx.BoxSizer(wx.HORIZONTAL)
+        self.pwd_row.Add(pwd_lbl, 0, wx.ALIGN_CENTER_VERTICAL | wx.RIGHT, 6)
+        self.pwd_row.Add(self.pwd_tc, 1, wx.ALIGN_CENTER_VERTICAL)
+        self.pwd_row.Add(self.save_pw_cb, 0, wx.LEFT | wx.ALIGN_CENTER_VERTICAL, 8)
+        top_controls_sizer.Add(self.pwd_row, 0, wx.EXPAND | wx.LEFT | wx.RIGHT | wx.BOTTOM, 6)
         
         # Buttons (Start/Stop/New)
         self.start_btn = wx.Button(self.chat_panel, label="&Start pipeline")
@@ -211,21 +354,10 @@ class MainFrame(wx.Frame):
 
         self.update_token_metrics()
 
-        entries = [
-            (wx.ACCEL_CTRL, ord("S"), self.start_btn.GetId()),
-            (wx.ACCEL_CTRL, ord("T"), self.stop_btn.GetId()),
-            (wx.ACCEL_CTRL, ord("R"), self.run_cmd_btn.GetId()),
-            (wx.ACCEL_CTRL, ord("C"), int(self.menu_id_copy_log)),
-            (wx.ACCEL_CTRL, ord("H"), int(self.menu_id_refresh_history)),
-            (wx.ACCEL_CTRL, ord("O"), int(self.menu_id_options)),
-            (wx.ACCEL_CTRL, ord("N"), int(self.menu_id_new_conversation)),
-        ]
-        self.SetAcceleratorTable(wx.AcceleratorTable(entries))
-
         self.restart_worker()
 
         # Ensure conversation dir matches the initial model/connection state
-        self.worker.q.put({"action": "update_conversation_directory", "password": self.get_password()})
+        self.worker.submit(UpdateConversationDirMsg(self.get_password()))
 
         self.auto_start_scheduled = False
         self.auto_update_codex = settings.DEFAULT_AUTO_UPDATE_CODEX
@@ -262,98 +394,94 @@ class MainFrame(wx.Frame):
         # Sync menu checks
         menubar = self.GetMenuBar()
         if menubar:
-            menubar.Check(int(self.menu_id_toggle_thinking), True)
-            menubar.Check(int(self.menu_id_toggle_tokens), False)
+            menubar.Check(int(self._ids.toggle_thinking), True)
+            menubar.Check(int(self._ids.toggle_tokens), False)
 
     def _build_menus(self) -> None:
+        if self._ids is None:
+            ids = wx.NewIdRef(count=len(self._MENU_IDS))
+            self._ids = SimpleNamespace(**dict(zip(self._MENU_IDS, ids)))
         menubar = wx.MenuBar()
 
         session_menu = wx.Menu()
         session_menu.Append(self.start_btn.GetId(), "Start Pipeline\tCtrl+S")
         session_menu.Append(self.stop_btn.GetId(), "Stop Worker\tCtrl+T")
         session_menu.AppendSeparator()
-        self.menu_id_new_conversation = wx.NewIdRef()
-        session_menu.Append(int(self.menu_id_new_conversation), "New Conversation\tCtrl+N")
-        self.menu_id_refresh_history = wx.NewIdRef()
-        session_menu.Append(int(self.menu_id_refresh_history), "Refresh History\tCtrl+H")
-        self.menu_id_change_dir = wx.NewIdRef()
-        session_menu.Append(int(self.menu_id_change_dir), "Change Conversation Directory…")
-        self.menu_id_load_path = wx.NewIdRef()
-        session_menu.Append(int(self.menu_id_load_path), "Load Conversation File…")
+        session_menu.Append(int(self._ids.new_conversation), "New Conversation\tCtrl+N")
+        session_menu.Append(int(self._ids.refresh_history), "Refresh History\tCtrl+H")
+        session_menu.Append(int(self._ids.change_dir), "Change Conversation Directory…")
+        session_menu.Append(int(self._ids.load_path), "Load Conversation File…")
         session_menu.AppendSeparator()
-        self.menu_id_clear_password = wx.NewIdRef()
-        session_menu.Append(int(self.menu_id_clear_password), "Clear Saved Password")
-        self.menu_id_show_password = wx.NewIdRef()
-        session_menu.Append(int(self.menu_id_show_password), "Show Password Panel")
+        session_menu.Append(int(self._ids.clear_password), "Clear Saved Password")
+        session_menu.Append(int(self._ids.show_password), "Show Password Panel")
         menubar.Append(session_menu, "&Session")
 
         tools_menu = wx.Menu()
-        self.menu_id_options = wx.NewIdRef()
-        tools_menu.Append(int(self.menu_id_options), "Options…\tCtrl+O")
-        self.menu_id_connection = wx.NewIdRef()
-        tools_menu.Append(int(self.menu_id_connection), "Connection Settings…")
+        tools_menu.Append(int(self._ids.options), "Options…\tCtrl+O")
+        tools_menu.Append(int(self._ids.connection), "Connection Settings…")
         menubar.Append(tools_menu, "&Tools")
 
         view_menu = wx.Menu()
-        self.menu_id_copy_log = wx.NewIdRef()
-        view_menu.Append(int(self.menu_id_copy_log), "Copy Conversation Log\tCtrl+C")
-        self.menu_id_clear_log = wx.NewIdRef()
-        view_menu.Append(int(self.menu_id_clear_log), "Clear Conversation Log")
-        self.menu_id_view_run_log = wx.NewIdRef()
-        view_menu.Append(int(self.menu_id_view_run_log), "View Run Log")
-        self.menu_id_toggle_thinking = wx.NewIdRef()
-        view_menu.AppendCheckItem(int(self.menu_id_toggle_thinking), "Show Full Token View (Thinking)")
-        view_menu.Check(int(self.menu_id_toggle_thinking), True)
-        self.menu_id_toggle_tokens = wx.NewIdRef()
-        view_menu.AppendCheckItem(int(self.menu_id_toggle_tokens), "Show Token Metrics")
-        view_menu.Check(int(self.menu_id_toggle_tokens), False)
+        view_menu.Append(int(self._ids.copy_log), "Copy Conversation Log\tCtrl+C")
+        view_menu.Append(int(self._ids.clear_log), "Clear Conversation Log")
+        view_menu.Append(int(self._ids.view_run_log), "View Run Log")
+        view_menu.AppendCheckItem(int(self._ids.toggle_thinking), "Show Full Token View (Thinking)")
+        view_menu.Check(int(self._ids.toggle_thinking), True)
+        view_menu.AppendCheckItem(int(self._ids.toggle_tokens), "Show Token Metrics")
+        view_menu.Check(int(self._ids.toggle_tokens), False)
         menubar.Append(view_menu, "&View")
 
         self.SetMenuBar(menubar)
 
-        self.Bind(wx.EVT_MENU, self.on_new_conversation, id=int(self.menu_id_new_conversation))
-        self.Bind(wx.EVT_MENU, self.on_copy_log, id=int(self.menu_id_copy_log))
-        self.Bind(wx.EVT_MENU, self.on_clear_log, id=int(self.menu_id_clear_log))
-        self.Bind(wx.EVT_MENU, self.on_open_options, id=int(self.menu_id_options))
-        self.Bind(wx.EVT_MENU, self.on_open_connection, id=int(self.menu_id_connection))
-        self.Bind(wx.EVT_MENU, self.on_view_run_log, id=int(self.menu_id_view_run_log))
-        self.Bind(wx.EVT_MENU, self.on_toggle_thinking, id=int(self.menu_id_toggle_thinking))
-        self.Bind(wx.EVT_MENU, self.on_toggle_tokens, id=int(self.menu_id_toggle_tokens))
-        self.Bind(wx.EVT_MENU, lambda evt: self.history_panel.on_refresh(evt), id=int(self.menu_id_refresh_history))
-        self.Bind(wx.EVT_MENU, lambda evt: self.history_panel.on_change_dir(evt), id=int(self.menu_id_change_dir))
-        self.Bind(wx.EVT_MENU, lambda evt: self.history_panel.on_load_path(evt), id=int(self.menu_id_load_path))
-        self.Bind(wx.EVT_MENU, self.on_clear_pw, id=int(self.menu_id_clear_password))
-        self.Bind(wx.EVT_MENU, lambda _evt: self.show_password_controls(), id=int(self.menu_id_show_password))
+        self.Bind(wx.EVT_MENU, self.on_new_conversation, id=int(self._ids.new_conversation))
+        self.Bind(wx.EVT_MENU, self.on_copy_log, id=int(self._ids.copy_log))
+        self.Bind(wx.EVT_MENU, self.on_clear_log, id=int(self._ids.clear_log))
+        self.Bind(wx.EVT_MENU, self.on_open_options, id=int(self._ids.options))
+        self.Bind(wx.EVT_MENU, self.on_open_connection, id=int(self._ids.connection))
+        self.Bind(wx.EVT_MENU, self.on_view_run_log, id=int(self._ids.view_run_log))
+        self.Bind(wx.EVT_MENU, self.on_toggle_thinking, id=int(self._ids.toggle_thinking))
+        self.Bind(wx.EVT_MENU, self.on_toggle_tokens, id=int(self._ids.toggle_tokens))
+        self.Bind(wx.EVT_MENU, lambda evt: self.history_panel.on_refresh(evt), id=int(self._ids.refresh_history))
+        self.Bind(wx.EVT_MENU, lambda evt: self.history_panel.on_change_dir(evt), id=int(self._ids.change_dir))
+        self.Bind(wx.EVT_MENU, lambda evt: self.history_panel.on_load_path(evt), id=int(self._ids.load_path))
+        self.Bind(wx.EVT_MENU, self.on_clear_pw, id=int(self._ids.clear_password))
+        self.Bind(wx.EVT_MENU, lambda _evt: self.show_password_controls(), id=int(self._ids.show_password))
+
+        entries = []
+        for key, target in self._ACCEL_SPEC:
+            ref = getattr(self._ids, target, None)
+            cmd_id = int(ref) if ref is not None else getattr(self, target).GetId()
+            entries.append((wx.ACCEL_CTRL, ord(key), cmd_id))
+        self.SetAcceleratorTable(wx.AcceleratorTable(entries))
 
     # Password handling -------------------------------------------
 
     def show_password_controls(self) -> None:
-        if backend.is_remote():
+        if self._is_remote:
             return
         if self.password_controls_visible:
             return
-        for widget in self.password_widgets:
-            widget.Show()
+        self.pwd_row.ShowItems(True)
         self.password_controls_visible = True
-        self.Layout()
+        # The row only lives in the chat panel; the splitter and history side are unaffected.
+        self.chat_panel.Layout()
 
     def hide_password_controls(self) -> None:
         if not self.password_controls_visible:
             return
-        for widget in self.password_widgets:
-            widget.Hide()
+        self.pwd_row.ShowItems(False)
         self.password_controls_visible = False
-        self.Layout()
+        self.chat_panel.Layout()
 
     def update_password_visibility(self) -> None:
-        if backend.is_remote() or backend.is_windows():
+        if self._is_remote or self._is_windows:
             self.hide_password_controls()
             self.save_pw_cb.SetValue(False)
             self.save_pw_cb.Enable(False)
             menubar = self.GetMenuBar()
-            if menubar and hasattr(self, "menu_id_clear_password"):
-                menubar.Enable(int(self.menu_id_clear_password), False)
-                menubar.Enable(int(self.menu_id_show_password), False)
+            if menubar and self._ids is not None:
+                menubar.Enable(int(self._ids.clear_password), False)
+                menubar.Enable(int(self._ids.show_password), False)
         else:
             self.save_pw_cb.Enable(True)
             if local_conf.get_saved_password():
@@ -363,9 +491,9 @@ class MainFrame(wx.Frame):
                 self.show_password_controls()
                 self.save_pw_cb.SetValue(False)
             menubar = self.GetMenuBar()
-            if menubar and hasattr(self, "menu_id_clear_password"):
-                menubar.Enable(int(self.menu_id_clear_password), True)
-                menubar.Enable(int(self.menu_id_show_password), True)
+            if menubar and self._ids is not None:
+                menubar.Enable(int(self._ids.clear_password), True)
+                menubar.Enable(int(self._ids.show_password), True)
 
     def update_title(self) -> None:
         mode_map = {
@@ -414,11 +542,18 @@ class MainFrame(wx.Frame):
             self.connection_mode = "windows"
             self.remote_password = None
 
-        self.SetStatusText(f"Ready ({backend.backend_description()})")
+        self._sync_backend_state()
+        self.SetStatusText(f"Ready ({self._backend_desc})")
         self.update_title()
 
+    def _sync_backend_state(self) -> None:
+        """Cache what the frame asks about the backend; only the connection code switches it."""
+        self._is_remote = backend.is_remote()
+        self._is_windows = backend.is_windows()
+        self._backend_desc = backend.backend_description()
+
     def load_saved_password(self) -> None:
-        if backend.is_remote() or backend.is_windows():
+        if self._is_remote or self._is_windows:
             self.pwd_tc.SetValue("")
             self.save_pw_cb.SetValue(False)
             self.hide_password_controls()
@@ -438,7 +573,7 @@ class MainFrame(wx.Frame):
         if getattr(self, "auto_start_scheduled", False):
             return
         conn_settings = local_conf.get_connection_settings()
-        if backend.is_remote():
+        if self._is_remote:
             host = conn_settings.get("host", "")
             password = conn_settings.get("password", "")
             if not host or not password:
@@ -504,9 +639,6 @@ class MainFrame(wx.Frame):
             self.connection_mode = "remote"
             self.remote_password = password or ""
             self.append_log(f"Switched to remote backend: {username}@{host}:{port}")
-            
-            # Skip remote OS detection for speed
-            self.SetStatusText(f"Ready ({backend.backend_description()})")
 
         elif mode == "wsl":
             try:
@@ -529,6 +661,7 @@ class MainFrame(wx.Frame):
             self.remote_password = None
             self.append_log("Switched to local Windows backend.")
 
+        self._sync_backend_state()
         self.update_password_visibility()
         self.load_saved_password()
         self.restart_worker()
@@ -536,10 +669,10 @@ class MainFrame(wx.Frame):
         self.schedule_auto_start()
         self.schedule_history_refresh()
         self.update_title()
-        self.worker.q.put({"action": "update_conversation_directory", "password": password})
+        self.worker.submit(UpdateConversationDirMsg(password))
 
     def get_password(self) -> Optional[str]:
-        if backend.is_remote():
+        if self._is_remote:
             # Use the stored remote password (needed for sudo and remote pipeline tasks)
             if self.remote_password:
                 return self.remote_password
@@ -551,49 +684,119 @@ class MainFrame(wx.Frame):
 
     def restart_worker(self) -> None:
         if self.worker:
-            self.worker.q.put({"action": "stop"})
+            self.worker.submit(StopMsg())
             self.worker.should_stop.set()
             try:
                 self.worker.join(timeout=2)
             except RuntimeError:
                 pass
+        # Whatever the old worker still had queued is gone with it.
+        self._pending_actions.clear()
         self.worker = Worker(self)
         self.worker.start()
-        self.SetStatusText(f"Idle ({backend.backend_description()})")
+        self.SetStatusText(f"Idle ({self._backend_desc})")
 
     def set_task(self, text: str) -> None:
-        def _():
-            self.task_lbl.SetLabel(text)
-            if text.lower() == "idle":
-                self.SetStatusText(f"Idle ({backend.backend_description()})")
-            else:
-                self.SetStatusText(text)
-            self.status_footer = text if text.lower() != "idle" else ""
-            self._render_thinking_text()
-
-        wx.CallAfter(_)
+        with self._ui_lock:
+            self._pending_task = text
+        self._request_ui_flush()
+
+    def _apply_task(self, text: str) -> None:
+        self.task_lbl.SetLabel(text)
+        if text.lower() == "idle":
+            self.SetStatusText(f"Idle ({self._backend_desc})")
+        else:
+            self.SetStatusText(text)
+        self.status_footer = text if text.lower() != "idle" else ""
+        self._render_thinking_text()
 
-    def _render_conversation_log(self) -> None:
-        text = "\n".join(self.conversation_log_lines)
-        if text:
-            text += "\n"
+    def _request_ui_flush(self) -> None:
+        """Make sure one flush is on its way; further requests before it runs are free."""
+        if not wx.GetApp():
+            return
+        with self._ui_lock:
+            if self._ui_flush_posted:
+                return
+            self._ui_flush_posted = True
+        # CallLater has to be created on the UI thread.
+        wx.CallAfter(wx.CallLater, 33, self._flush_ui)
+
+    def _flush_ui(self) -> None:
+        """Apply every pending streaming update in one pass (UI thread only)."""
+        with self._ui_lock:
+            self._ui_flush_posted = False
+            log_dirty, self._log_dirty = self._log_dirty, False
+            thinking, self._pending_thinking = self._pending_thinking, []
+            task, self._pending_task = self._pending_task, None
+            tokens, self._pending_tokens = self._pending_tokens, None
+        if not wx.GetApp():
+            return
+        # One Freeze per touched control for the whole pass, so it repaints once per flush.
+        frozen = []
+        if log_dirty:
+            frozen.append(self.output_tc)
+        if thinking or task is not None:
+            frozen.append(self.thinking_tc)
+        for ctrl in frozen:
+            ctrl.Freeze()
+        try:
+            if log_dirty:
+                self._flush_pending_log()
+            if task is not None:
+                # The task footer change re-renders the thinking box anyway.
+                self.thinking_history.extend(thinking)
+                self._apply_task(task)
+            elif thinking:
+                self._append_thinking_chunks(thinking)
+        finally:
+            for ctrl in frozen:
+                ctrl.Thaw()
+        if tokens is not None:
+            self._apply_token_metrics(tokens)
+
+    def _render_conversation_log(self, force: bool = False) -> None:
+        lines = list(self.conversation_log_lines)
+        text = _join_log_lines(lines)
+        # Outside a trim, lines are only appended, prepended or cleared, each of which
+        # changes the count or the length; equal both means the box already shows this text.
+        if not force and len(lines) == self._log_rendered_count and len(text) == self._log_rendered_chars:
+            return
+        # A full render already includes anything still waiting to be appended.
+        self._log_rendered_count = len(lines)
+        self._log_rendered_chars = len(text)
         self._set_text_preserve_view(self.output_tc, text)
 
+    def _flush_pending_log(self) -> None:
+        lines = self.conversation_log_lines
+        if not _trim_head(lines, settings.MAX_LOG_LINES):
+            new_lines = lines[self._log_rendered_count :]
+            if not new_lines:
+                return
+            text = "\n".join(new_lines) + "\n"
+            if self._log_rendered_chars + len(text) <= settings.MAX_LOG_CHARS:
+                self._log_rendered_count += len(new_lines)
+                self._log_rendered_chars += len(text)
+                self._append_text_preserve_view(self.output_tc, text)
+                return
+            _trim_head_chars(lines, settings.MAX_LOG_CHARS)
+        # Control positions need not match Python string offsets (UTF-16 units and
+        # wrapped lines on Windows), so a trimmed head is re-rendered, not Remove()d.
+        self._render_conversation_log(force=True)
+
     def _append_conversation_line(self, text: str) -> None:
         self.conversation_log_lines.append(text)
-
-        def _():
-            if wx.GetApp():
-                self._render_conversation_log()
-
-        if wx.GetApp():
-            wx.CallAfter(_)
+        # Append only the new lines, coalescing a burst into one AppendText,
+        # instead of re-joining and re-setting the whole log per line.
+        with self._ui_lock:
+            self._log_dirty = True
+        self._request_ui_flush()
 
     def _prepend_conversation_line(self, text: str) -> None:
         self.conversation_log_lines.insert(0, text)
 
         def _():
             if wx.GetApp():
+                self._flush_ui()
                 self._render_conversation_log()
 
         if wx.GetApp():
@@ -627,10 +830,11 @@ class MainFrame(wx.Frame):
             hpos = ctrl.GetScrollPos(wx.HORIZONTAL)
             last = ctrl.GetLastPosition()
         except Exception:
-            ctrl.SetValue(text)
+            ctrl.ChangeValue(text)
             return
         ctrl.Freeze()
-        ctrl.SetValue(text)
+        # ChangeValue: same as SetValue minus the EVT_TEXT nothing here listens for.
+        ctrl.ChangeValue(text)
         try:
             caret = min(caret, ctrl.GetLastPosition())
             ctrl.SetInsertionPoint(caret)
@@ -645,6 +849,35 @@ class MainFrame(wx.Frame):
         finally:
             ctrl.Thaw()
 
+    def _append_text_preserve_view(self, ctrl: wx.TextCtrl, text: str, start: Optional[int] = None) -> None:
+        """Append text (replacing everything from start, if given) without yanking the user's view."""
+        try:
+            caret = ctrl.GetInsertionPoint()
+            vpos = ctrl.GetScrollPos(wx.VERTICAL)
+            hpos = ctrl.GetScrollPos(wx.HORIZONTAL)
+            last = ctrl.GetLastPosition()
+        except Exception:
+            ctrl.AppendText(text)
+            return
+        ctrl.Freeze()
+        try:
+            if start is None:
+                # WriteText at the end is cheaper than AppendText for larger batches.
+                ctrl.SetInsertionPointEnd()
+                ctrl.WriteText(text)
+            else:
+                ctrl.Replace(start, last, text)
+            ctrl.SetInsertionPoint(min(caret, ctrl.GetLastPosition()))
+            try:
+                if last == 0:
+                    return
+                ctrl.ScrollLines(vpos - ctrl.GetScrollPos(wx.VERTICAL))
+                ctrl.SetScrollPos(wx.HORIZONTAL, hpos, refresh=False)
+            except Exception:
+                pass
+        finally:
+            ctrl.Thaw()
+
     def _safe_set_text_preserve_view(self, ctrl: wx.TextCtrl, text: str, scroll_to_end: bool = False) -> None:
         """Safer variant to guard against screen-reader/driver quirks."""
         try:
@@ -656,7 +889,7 @@ class MainFrame(wx.Frame):
                     pass
         except Exception:
             try:
-                ctrl.SetValue(text)
+                ctrl.ChangeValue(text)
             except Exception:
                 pass
 
@@ -729,6 +962,9 @@ class MainFrame(wx.Frame):
     def _force_hide_token_metrics(self) -> None:
         """Hide token metrics in both chat panel and history panel, and keep them out of tab order."""
         self.show_tokens = False
+        # The label may be recreated with placeholder text, so the next update must render.
+        with self._ui_lock:
+            self._last_metrics_text = None
         panel = getattr(self, "token_metrics_panel", None)
 
         # Remove from chat bottom sizer if present
@@ -792,20 +1028,63 @@ class MainFrame(wx.Frame):
                 # Remove it (but don't destroy the window, just remove from notebook)
                 self.notebook.RemovePage(thinking_page_index)
 
+    def _thinking_footer_text(self, has_body: bool) -> str:
+        footer = f"Status: {self.status_footer}" if self.status_footer else ""
+        if has_body:
+            return (f"\n\n{footer}" if footer else "") + "\n"
+        return f"{footer}\n" if footer else ""
+
     def _render_thinking_text(self) -> None:
+        _trim_head(self.thinking_history, settings.MAX_THINKING_CHUNKS)
+        ctrl = self.thinking_tc
         body = "\n\n".join(self.thinking_history).strip()
-        footer = f"Status: {self.status_footer}" if self.status_footer else ""
-        parts = [p for p in (body, footer) if p]
-        combined = "\n\n".join(parts)
-        if combined:
-            combined += "\n"
-        self._safe_set_text_preserve_view(self.thinking_tc, combined)
+        footer = self._thinking_footer_text(bool(body))
+        self._thinking_body_end = None
+        try:
+            ctrl.Freeze()
+        except Exception:
+            self._safe_set_text_preserve_view(ctrl, body + footer)
+            return
+        try:
+            # Body and footer go in separately so the footer's start is known in the
+            # control's own position units (plain MSW edits count "\n" as two).
+            self._safe_set_text_preserve_view(ctrl, body)
+            if body:
+                self._thinking_body_end = ctrl.GetLastPosition()
+            if footer:
+                self._append_text_preserve_view(ctrl, footer)
+        except Exception:
+            self._thinking_body_end = None
+        finally:
+            ctrl.Thaw()
+
+    def _append_thinking_chunks(self, chunks: List[str]) -> None:
+        """Show more thinking chunks by rewriting only the tail (new chunks + footer)."""
+        had_body = bool(self.thinking_history)
+        self.thinking_history.extend(chunks)
+        start = self._thinking_body_end
+        if not had_body or start is None or _trim_head(self.thinking_history, settings.MAX_THINKING_CHUNKS):
+            self._render_thinking_text()
+            return
+        ctrl = self.thinking_tc
+        try:
+            ctrl.Freeze()
+            try:
+                self._append_text_preserve_view(ctrl, "\n\n" + "\n\n".join(chunks), start=start)
+                self._thinking_body_end = ctrl.GetLastPosition()
+                footer = self._thinking_footer_text(True)
+                if footer:
+                    self._append_text_preserve_view(ctrl, footer)
+            finally:
+                ctrl.Thaw()
+        except Exception:
+            self._render_thinking_text()
 
     def reset_live_activity(self) -> None:
         self.live_activity_raw = []
         self.live_activity_pending = False
         def _():
-            self.live_activity_tc.SetValue("")
+            self.live_activity_tc.ChangeValue("")
         if wx.GetApp():
             wx.CallAfter(_)
 
@@ -854,6 +1133,7 @@ class MainFrame(wx.Frame):
 
         def _():
             if wx.GetApp():
+                self._flush_ui()
                 self._render_conversation_log()
 
         if wx.GetApp():
@@ -893,18 +1173,18 @@ class MainFrame(wx.Frame):
         if not clean:
             return
 
-        def _():
-            self.thinking_history.append(clean)
-            self._render_thinking_text()
-
-        if wx.GetApp():
-            wx.CallAfter(_)
+        with self._ui_lock:
+            self._pending_thinking.append(clean)
+        self._request_ui_flush()
         self._maybe_update_tokens(clean)
 
     def begin_run_log(self) -> None:
+        # Reset here rather than in the CallAfter so chunks that follow are never dropped.
+        self._run_log_buf = io.StringIO()
+        self._last_run_log_buf = io.StringIO()
+
         def _():
-            self.current_run_log_chunks = []
-            self.last_run_log = ""
+            self._flush_ui()
             self.status_footer = "Running..."
             self._render_thinking_text()
 
@@ -913,16 +1193,14 @@ class MainFrame(wx.Frame):
     def append_run_log_chunk(self, chunk: str) -> None:
         if chunk is None:
             return
-
-        def _():
-            self.current_run_log_chunks.append(chunk)
-
-        wx.CallAfter(_)
+        # Nothing on screen changes per chunk, so no UI-thread hop is needed.
+        self._run_log_buf.write(chunk)
 
     def finish_run_log(self, success: bool) -> None:
+        self._last_run_log_buf = self._run_log_buf
+
         def _():
-            text = "".join(self.current_run_log_chunks)
-            self.last_run_log = text
+            self._flush_ui()
             self.status_footer = "Idle" if success else "Completed with errors"
             self._render_thinking_text()
 
@@ -933,18 +1211,16 @@ class MainFrame(wx.Frame):
     def history_label(self, path: str) -> str:
         if not path:
             return path
-        base = self.conversation_dir or ""
         normalized_path = path.replace("\\", "/")
-        normalized_base = base.replace("\\", "/")
-        if normalized_base and normalized_path.startswith(normalized_base.rstrip("/") + "/"):
-            rel = normalized_path[len(normalized_base.rstrip("/")) + 1 :]
-            return rel or path
-        if normalized_path.startswith("/root/.codex/"):
-            return normalized_path[len("/root/.codex/") :]
-        win_default = settings.DEFAULT_WINDOWS_CONVERSATION_DIR.replace("\\", "/")
-        if normalized_path.startswith(win_default.rstrip("/") + "/"):
-            rel = normalized_path[len(win_default.rstrip("/")) + 1 :]
-            return rel or path
+        # Prefixes are normalized once per directory value, not once per list item.
+        for prefix in (
+            _label_prefix(self.conversation_dir or ""),
+            _CODEX_HOME_PREFIX,
+            _label_prefix(settings.DEFAULT_WINDOWS_CONVERSATION_DIR),
+        ):
+            rel = normalized_path.removeprefix(prefix)
+            if rel != normalized_path:
+                return rel or path
         return path
 
     def get_conversation_dir(self) -> Optional[str]:
@@ -1006,6 +1282,10 @@ class MainFrame(wx.Frame):
         self.set_current_conversation(path)
         wx.CallAfter(self.history_panel.show_file, path, text)
 
+    def action_done(self, action: str) -> None:
+        """Called by the worker (any thread) when a coalesced action has finished."""
+        wx.CallAfter(self._pending_actions.discard, action)
+
     def start_new_conversation(self, path: str) -> None:
         def _():
             self.current_conversation_path = path
@@ -1017,28 +1297,39 @@ class MainFrame(wx.Frame):
             self.schedule_history_refresh()
             self.conversation_has_been_labeled = False # Reset flag for new conversation
             pw = self.get_password()
-            self.worker.q.put({"action": "open_history", "password": pw if pw else None, "path": path})
+            self.worker.submit(OpenHistoryMsg(pw if pw else None, path))
 
         wx.CallAfter(_)
 
     def schedule_history_refresh(self) -> None:
+        # A connection switch or directory change asks several times in a row;
+        # collapse the burst into one rescan using the state at the end of it.
+        if self._history_refresh_pending:
+            return
+        if not wx.GetApp():
+            self._post_history_refresh()
+            return
+        self._history_refresh_pending = True
+        wx.CallLater(150, self._post_history_refresh)
+
+    def _post_history_refresh(self) -> None:
+        self._history_refresh_pending = False
+        if not self:
+            # Frame destroyed while the refresh was pending.
+            return
         pw = self.get_password()
-        self.worker.q.put(
-            {
-                "action": "refresh_history",
-                "password": pw if pw else None,
-                "conversation_dir": self.conversation_dir,
-            }
-        )
+        self.worker.submit(RefreshHistoryMsg(pw if pw else None, self.conversation_dir))
 
     def clear_thinking(self, initial_text: Optional[str] = None) -> None:
+        # Normalize on the calling thread; the UI thread only swaps in the result.
+        clean = normalize_thinking_text(initial_text) if initial_text else ""
+
         def _():
+            self._flush_ui()
             self.thinking_history = []
             self.thinking_tc.Clear()
-            if initial_text:
-                clean = normalize_thinking_text(initial_text)
-                if clean:
-                    self.thinking_history.append(clean)
+            if clean:
+                self.thinking_history.append(clean)
             self._render_thinking_text()
 
         wx.CallAfter(_)
@@ -1054,102 +1345,39 @@ class MainFrame(wx.Frame):
     # Token metrics ------------------------------------------------
 
     def _maybe_update_tokens(self, text: str) -> None:
-        if not text:
+        metrics = parse_token_metrics(text)
+        if metrics is None:
             return
+        used, remaining, fraction = metrics
         updated = False
-        normalized = text
-        if normalized.lower().startswith("[stderr]"):
-            normalized = normalized[len("[stderr]") :].lstrip()
-
-        def _update_used(value: int) -> bool:
-            if value < 0:
-                return False
-            self.tokens_used = value
+
+        if used >= 0:
+            self.tokens_used = used
             if self.token_budget <= 0 or self.tokens_used > self.token_budget:
                 self.token_budget = max(self.tokens_used, self.token_budget or 0)
             if self.token_budget > 0:
                 self.tokens_remaining = max(self.token_budget - self.tokens_used, 0)
             else:
                 self.tokens_remaining = None
-            return True
-
-        used_updated = False
+            updated = True
+
+        if remaining >= 0:
+            self.tokens_remaining = remaining
+            estimate = None
+            if fraction > 0.0:
+                estimate = int(round(remaining / fraction))
+            if estimate is None and self.tokens_used >= 0:
+                estimate = remaining + self.tokens_used
+            if estimate and estimate > 0 and estimate >= self.tokens_used:
+                self.token_budget = max(self.token_budget or 0, estimate)
+                self.tokens_remaining = min(remaining, self.token_budget)
+            else:
+                if self.token_budget <= 0:
+                    self.token_budget = remaining + self.tokens_used
+                self.tokens_remaining = remaining
+            updated = True
 
-        match = re.search(r"tokens?\s+used[:\s-]*([0-9,]+)", normalized, re.IGNORECASE)
-        if match:
-            try:
-                used = int(match.group(1).replace(",", ""))
-            except ValueError:
-                used = -1
-            if _update_used(used):
-                used_updated = True
-
-        if not used_updated:
-            usage_match = re.search(r"token\s+usage[^:]*:\s*(.*)", normalized, re.IGNORECASE)
-            if usage_match:
-                payload = usage_match.group(1)
-                total_match = re.search(r"total\s*(?:tokens?)?\s*=?\s*([0-9,]+)", payload, re.IGNORECASE)
-                candidate = None
-                if total_match:
-                    candidate = total_match.group(1)
-                else:
-                    numbers = re.findall(r"([0-9][0-9,]*)", payload)
-                    if numbers:
-                        candidate = numbers[-1]
-                if candidate:
-                    try:
-                        used = int(candidate.replace(",", ""))
-                    except ValueError:
-                        used = -1
-                    if _update_used(used):
-                        used_updated = True
-
-        if not used_updated:
-            total_only = re.search(r"total\s+tokens?:\s*([0-9,]+)", normalized, re.IGNORECASE)
-            if total_only:
-                try:
-                    used = int(total_only.group(1).replace(",", ""))
-                except ValueError:
-                    used = -1
-                if _update_used(used):
-                    used_updated = True
-
-        text_lower = normalized.lower()
-        if "context" in text_lower or "ctx" in text_lower:
-            rem_match = re.search(
-                r"(?:context\s*(?:remaining|left|available)|(?:remaining|left)\s*(?:context|tokens?))[\s:=-]*([0-9][0-9,]*)",
-                normalized,
-                re.IGNORECASE,
-            )
-            if rem_match:
-                try:
-                    remaining = int(rem_match.group(1).replace(",", ""))
-                except ValueError:
-                    remaining = -1
-                if remaining >= 0:
-                    self.tokens_remaining = remaining
-                    tail = normalized[rem_match.end() :]
-                    pct_match = re.search(r"([0-9]+(?:\.[0-9]+)?)\s*%", tail)
-                    estimate = None
-                    if pct_match:
-                        try:
-                            pct_val = float(pct_match.group(1)) / 100.0
-                        except ValueError:
-                            pct_val = 0.0
-                        if 0.0 < pct_val <= 1.0 and remaining >= 0:
-                            estimate = int(round(remaining / pct_val))
-                    if estimate is None and self.tokens_used >= 0:
-                        estimate = remaining + self.tokens_used
-                    if estimate and estimate > 0 and estimate >= self.tokens_used:
-                        self.token_budget = max(self.token_budget or 0, estimate)
-                        self.tokens_remaining = min(remaining, self.token_budget)
-                    else:
-                        if self.token_budget <= 0:
-                            self.token_budget = remaining + self.tokens_used
-                        self.tokens_remaining = remaining
-                    updated = True
-
-        if used_updated or updated:
+        if updated:
             self.update_token_metrics()
 
     def update_token_metrics(self) -> None:
@@ -1177,40 +1405,45 @@ class MainFrame(wx.Frame):
             self._force_hide_token_metrics()
             return
 
-        def _update_labels():
-            if getattr(self, "token_metrics_lbl", None):
-                self.token_metrics_lbl.SetLabel(text)
-                self.token_metrics_lbl.Wrap(600)
-            self.history_panel.update_metrics(text)
-            if not self.show_tokens:
-                # Ensure hidden state stays enforced even if downstream calls try to show it.
-                try:
-                    self._set_token_metrics_visible(False)
-                except Exception:
-                    pass
-
-        wx.CallAfter(_update_labels)
+        with self._ui_lock:
+            if text == self._last_metrics_text:
+                return
+            self._last_metrics_text = text
+            self._pending_tokens = text
+        self._request_ui_flush()
+
+    def _apply_token_metrics(self, text: str) -> None:
+        if getattr(self, "token_metrics_lbl", None):
+            # One short line; Wrap (re-measure plus relayout) is left to creation and show.
+            self.token_metrics_lbl.SetLabel(text)
+        self.history_panel.update_metrics(text)
+        if not self.show_tokens:
+            # Ensure hidden state stays enforced even if downstream calls try to show it.
+            try:
+                self._set_token_metrics_visible(False)
+            except Exception:
+                pass
 
     # Button/menu callbacks ---------------------------------------
 
     def on_start(self, _evt) -> None:
         pw = self.get_password()
-        if not backend.is_remote() and self.save_pw_cb.GetValue():
+        if not self._is_remote and self.save_pw_cb.GetValue():
             try:
                 local_conf.save_password(pw or "")
                 self.append_log("Password saved to conf file.")
             except Exception as exc:  # pragma: no cover - defensive
                 self.append_log(f"Failed to save password: {exc}")
-        self.worker.q.put({"action": "pipeline", "password": pw, "conversation_dir": self.conversation_dir})
-        if not backend.is_remote():
+        self.worker.submit(PipelineMsg(pw, self.conversation_dir))
+        if not self._is_remote:
             self.hide_password_controls()
 
     def on_stop(self, _evt) -> None:
-        self.worker.q.put({"action": "stop"})
+        self.worker.submit(StopMsg())
         self.append_log("Requested worker stop. Close the window to exit.")
 
     def on_clear_pw(self, _evt) -> None:
-        if backend.is_remote():
+        if self._is_remote:
             wx.MessageBox(
                 "Local sudo password is not used while a remote backend is active.",
                 "Information",
@@ -1225,27 +1458,30 @@ class MainFrame(wx.Frame):
         self.update_password_visibility()
 
     def on_run_cmd(self, _evt) -> None:
-        prompt = self.cmd_tc.GetValue().strip()
+        # strip() hands back the same string when there is nothing to trim, so a large
+        # pasted prompt is only copied once more if it really has surrounding whitespace.
+        prompt = "" if self.cmd_tc.IsEmpty() else self.cmd_tc.GetValue().strip()
         if not prompt:
             self.append_log("No prompt provided.")
             return
         pw = self.get_password()
-        self.worker.q.put(
-            {
-                "action": "run_cmd",
-                "password": pw,
-                "prompt": prompt,
-                "conversation": self.current_conversation_path,
-                "conversation_dir": self.conversation_dir,
-            }
+        self.worker.submit(
+            RunCmdMsg(
+                password=pw,
+                prompt=prompt,
+                conversation=self.current_conversation_path,
+                conversation_dir=self.conversation_dir,
+            )
         )
         # Keep prompt text so the user can review/edit after sending
         self.cmd_tc.SetFocus()
 
     def on_copy_log(self, _evt) -> None:
-        text = self.output_tc.GetValue()
+        # Copy a snapshot of the lines the box is rendered from (not GetValue, which
+        # would copy and convert the whole control buffer); the text is built at paste time.
+        data = _LogTextDataObject(list(self.conversation_log_lines))
         if wx.TheClipboard.Open():
-            wx.TheClipboard.SetData(wx.TextDataObject(text))
+            wx.TheClipboard.SetData(data)
             wx.TheClipboard.Close()
             self.SetStatusText("Output copied to clipboard.")
         else:
@@ -1260,26 +1496,34 @@ class MainFrame(wx.Frame):
         self.SetStatusText("Thinking log cleared.")
 
     def on_new_conversation(self, _evt) -> None:
+        # Repeated clicks while one is queued or running would only create extra files.
+        if "new_conversation" in self._pending_actions:
+            return
+        self._pending_actions.add("new_conversation")
         pw = self.get_password()
-        self.worker.q.put({"action": "new_conversation", "password": pw, "conversation_dir": self.conversation_dir})
+        self.worker.submit(NewConversationMsg(pw, self.conversation_dir))
 
     def on_open_options(self, _evt) -> None:
         if self.options_dialog and self.options_dialog.IsShown():
             self.options_dialog.Raise()
             return
-        dlg = OptionsDialog(self, self)
-        self.options_dialog = dlg
+        dlg = self.options_dialog
+        if dlg is None:
+            dlg = self.options_dialog = OptionsDialog(self, self)
+        else:
+            # Show what a freshly built dialog would, not the edits left from last time.
+            dlg.reset_to_defaults()
         if self.last_options_toml:
             dlg.set_from_toml(self.last_options_toml)
-        try:
-            dlg.ShowModal()
-        finally:
-            dlg.Destroy()
-            self.options_dialog = None
+        dlg.ShowModal()
 
     def on_open_connection(self, _evt) -> None:
         settings_data = local_conf.get_connection_settings()
-        dlg = ConnectionDialog(self, settings_data)
+        dlg = self._connection_dialog
+        if dlg is None:
+            dlg = self._connection_dialog = ConnectionDialog(self, settings_data)
+        else:
+            dlg.set_values(settings_data)
         try:
             if dlg.ShowModal() != wx.ID_OK:
                 return
@@ -1291,21 +1535,30 @@ class MainFrame(wx.Frame):
             password = values.get("password", "")
 
             if mode == "remote":
-                if not host:
-                    wx.MessageBox("Remote host is required.", "Connection Error", wx.ICON_ERROR | wx.OK)
-                    return
-                if not username:
-                    wx.MessageBox("Username is required for remote connection.", "Connection Error", wx.ICON_ERROR | wx.OK)
-                    return
-                if not password:
-                    wx.MessageBox("Password is required for remote connection.", "Connection Error", wx.ICON_ERROR | wx.OK)
+                # Report every missing field in one message instead of one dialog per field.
+                missing = [
+                    name
+                    for name, value in (("Host", host), ("Username", username), ("Password", password))
+                    if not value
+                ]
+                if missing:
+                    wx.MessageBox(
+                        "Remote connection requires: " + ", ".join(missing) + ".",
+                        "Connection Error",
+                        wx.ICON_ERROR | wx.OK,
+                    )
                     return
             self.apply_connection_settings(mode, host, port, username, password)
         finally:
-            dlg.Destroy()
+            # Do not keep the password in a hidden control between uses.
+            dlg.pass_txt.ChangeValue("")
 
     def on_view_run_log(self, _evt) -> None:
-        text = self.last_run_log or "(no log captured)"
-        dlg = RunLogDialog(self, text)
+        dlg = self._run_log_dialog
+        if dlg is None:
+            dlg = self._run_log_dialog = RunLogDialog(self)
+        # The finished run's buffer is no longer written to, so it can be read in place.
+        dlg.load(self._last_run_log_buf)
         dlg.ShowModal()
-        dlg.Destroy()
+        # The hidden dialog should not pin a large log in memory.
+        dlg.clear()
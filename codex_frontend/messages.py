@@ -0,0 +1,93 @@
+"""Records the UI posts to the worker queue, one type per action."""
+from __future__ import annotations
+
+from typing import List, NamedTuple, Optional, Union
+
+
+def _redacted_repr(self) -> str:
+    """repr() that never shows the password, so a logged message cannot leak it."""
+    fields = ", ".join(
+        f"{name}={'***' if name == 'password' and value else repr(value)}"
+        for name, value in zip(self._fields, self)
+    )
+    return f"{type(self).__name__}({fields})"
+
+
+class PipelineMsg(NamedTuple):
+    password: Optional[str]
+    conversation_dir: Optional[str]
+
+    __repr__ = _redacted_repr
+
+
+class RunCmdMsg(NamedTuple):
+    password: Optional[str]
+    prompt: str
+    conversation: Optional[str]
+    conversation_dir: Optional[str]
+
+    __repr__ = _redacted_repr
+
+
+class LoadConfigMsg(NamedTuple):
+    password: Optional[str]
+
+    __repr__ = _redacted_repr
+
+
+class SaveConfigMsg(NamedTuple):
+    password: Optional[str]
+    model: Optional[str]
+    approval_policy: str
+    sandbox_mode: str
+    web_search: bool
+    intelligence: str
+    reasoning_level: str
+    auto_update_codex: bool
+    trust_paths: List[str]
+
+    __repr__ = _redacted_repr
+
+
+class RefreshHistoryMsg(NamedTuple):
+    password: Optional[str]
+    conversation_dir: Optional[str]
+
+    __repr__ = _redacted_repr
+
+
+class OpenHistoryMsg(NamedTuple):
+    password: Optional[str]
+    path: str
+
+    __repr__ = _redacted_repr
+
+
+class NewConversationMsg(NamedTuple):
+    password: Optional[str]
+    conversation_dir: Optional[str]
+
+    __repr__ = _redacted_repr
+
+
+class UpdateConversationDirMsg(NamedTuple):
+    password: Optional[str]
+
+    __repr__ = _redacted_repr
+
+
+class StopMsg(NamedTuple):
+    pass
+
+
+WorkerMessage = Union[
+    PipelineMsg,
+    RunCmdMsg,
+    LoadConfigMsg,
+    SaveConfigMsg,
+    RefreshHistoryMsg,
+    OpenHistoryMsg,
+    NewConversationMsg,
+    UpdateConversationDirMsg,
+    StopMsg,
+]
@@ -6,6 +6,29 @@ from typing import List, Optional, Tuple
 
 TIMESTAMP_LINE_RE = re.compile(r"^\[[0-9]{4}-[0-9]{2}-[0-9]{2}T[^\]]*\]\s*(.*)$")
 
+OS_RELEASE_RE = re.compile(r'^(PRETTY_NAME|NAME)="?([^"\n]*)"?', re.M)
+
+# Token metrics: one alternation finds every kind of metric in a single scan of the line.
+# The usage alternative stops at its colon, so a metric after it is still found.
+TOKEN_METRIC_RE = re.compile(
+    r"(?P<used>tokens?\s+used[:\s-]*(?P<used_n>[0-9,]+))"
+    r"|(?P<usage>token\s+usage[^:]*:)"
+    r"|(?P<total>total\s+tokens?:\s*(?P<total_n>[0-9,]+))"
+    r"|(?P<rem>(?:context\s*(?:remaining|left|available)|(?:remaining|left)\s*(?:context|tokens?))"
+    r"[\s:=-]*(?P<rem_n>[0-9][0-9,]*))",
+    re.IGNORECASE,
+)
+USAGE_TOTAL_RE = re.compile(r"total\s*(?:tokens?)?\s*=?\s*([0-9,]+)", re.IGNORECASE)
+NUMBER_RE = re.compile(r"([0-9][0-9,]*)")
+PERCENT_RE = re.compile(r"([0-9]+(?:\.[0-9]+)?)\s*%")
+
+# One shell round-trip for both the architecture and the OS name.
+SYSTEM_PROBE_SENTINEL = "---"
+SYSTEM_PROBE_SCRIPT = (
+    f"uname -m; echo {SYSTEM_PROBE_SENTINEL}; "
+    "grep -E '^(PRETTY_NAME|NAME)=' /etc/os-release || uname -s"
+)
+
 
 def split_codex_output(text: str) -> Tuple[List[str], str]:
     """Separate Codex 'thinking' sections from the rest of the transcript."""
@@ -133,28 +156,123 @@ def should_hide_from_output(line: str) -> bool:
     return lower.startswith("--------") or candidate_lower.startswith(banner_prefixes)
 
 
+def _normalize_thinking_line(stripped: str) -> str:
+    # Only lines starting with "[" can carry a timestamp; skip the regex for the rest.
+    if stripped.startswith("["):
+        match = TIMESTAMP_LINE_RE.match(stripped)
+        if match:
+            stripped = (match.group(1) or "").strip()
+    if len(stripped) == 5 and stripped.lower() == "codex":
+        stripped = "finished!"
+    return stripped
+
+
 def normalize_thinking_text(text: str) -> str:
     lines: List[str] = []
     for raw in text.splitlines():
         stripped = raw.strip()
         if not stripped:
             continue
-        match = TIMESTAMP_LINE_RE.match(stripped)
-        if match:
-            stripped = (match.group(1) or "").strip()
-        if stripped.lower() == "codex":
-            stripped = "finished!"
+        stripped = _normalize_thinking_line(stripped)
         if stripped:
             lines.append(stripped)
     if not lines:
         stripped = text.strip()
         if not stripped:
             return ""
-        match = TIMESTAMP_LINE_RE.match(stripped)
-        if match:
-            stripped = (match.group(1) or "").strip()
-        if stripped.lower() == "codex":
-            stripped = "finished!"
-        return stripped
+        return _normalize_thinking_line(stripped)
     return "\n".join(lines)
 
+
+def first_line(text: Optional[str]) -> str:
+    """Return the first line of text, stripped, without splitting the rest of it."""
+    return (text or "").lstrip().partition("\n")[0].strip()
+
+
+def last_line(text: Optional[str]) -> str:
+    """Return the last non-empty line of text, stripped."""
+    return (text or "").rstrip().rpartition("\n")[2].strip()
+
+
+def parse_os_release(text: str) -> str:
+    """Return PRETTY_NAME (or NAME) from os-release lines, else the raw text."""
+    text = text.strip()
+    name = None
+    for match in OS_RELEASE_RE.finditer(text):
+        if match.group(1) == "PRETTY_NAME":
+            return match.group(2)
+        if name is None:
+            name = match.group(2)
+    return name if name is not None else text
+
+
+def split_system_probe(text: str) -> Tuple[str, str]:
+    """Split SYSTEM_PROBE_SCRIPT output into (os_name, arch); missing parts come back empty."""
+    arch_part, sep, os_part = ("\n" + (text or "")).partition(f"\n{SYSTEM_PROBE_SENTINEL}\n")
+    if not sep:
+        return "", arch_part.strip()
+    return parse_os_release(os_part), arch_part.strip()
+
+
+def _metric_int(text: str) -> int:
+    try:
+        return int(text.replace(",", ""))
+    except ValueError:
+        return -1
+
+
+def parse_token_metrics(text: str) -> Optional[Tuple[int, int, float]]:
+    """Pull (used, remaining, remaining_fraction) out of one log line.
+
+    Absent values are -1; None means the line cannot mention token metrics at all.
+    """
+    if not text:
+        return None
+    text_lower = text.lower()
+    # Every pattern needs one of these words; most log lines have none.
+    if "token" not in text_lower and "ctx" not in text_lower and "context" not in text_lower:
+        return None
+    normalized = text
+    if text_lower.startswith("[stderr]"):
+        normalized = normalized[len("[stderr]") :].lstrip()
+
+    # First match of each kind, from one pass over the line.
+    found = {}
+    for m in TOKEN_METRIC_RE.finditer(normalized):
+        found.setdefault(m.lastgroup, m)
+
+    used = -1
+    match = found.get("used")
+    if match:
+        used = _metric_int(match.group("used_n"))
+
+    usage_match = found.get("usage")
+    if used < 0 and usage_match:
+        payload = normalized[usage_match.end() :].split("\n", 1)[0].lstrip()
+        total_match = USAGE_TOTAL_RE.search(payload)
+        candidate = None
+        if total_match:
+            candidate = total_match.group(1)
+        else:
+            numbers = NUMBER_RE.findall(payload)
+            if numbers:
+                candidate = numbers[-1]
+        if candidate:
+            used = _metric_int(candidate)
+
+    total_only = found.get("total")
+    if used < 0 and total_only:
+        used = _metric_int(total_only.group("total_n"))
+
+    remaining = -1
+    fraction = -1.0
+    rem_match = found.get("rem")
+    if rem_match and ("context" in text_lower or "ctx" in text_lower):
+        remaining = _metric_int(rem_match.group("rem_n"))
+        if remaining >= 0:
+            pct_match = PERCENT_RE.search(normalized, rem_match.end())
+            if pct_match:
+                pct_val = float(pct_match.group(1)) / 100.0
+                if 0.0 < pct_val <= 1.0:
+                    fraction = pct_val
+    return used, remaining, fraction
@@ -1,11 +1,10 @@
-"""Dataclass representing the result of a command run inside WSL."""
+"""Lightweight record describing the result of a backend command."""
 from __future__ import annotations
 
-from dataclasses import dataclass
+from typing import NamedTuple
 
 
-@dataclass
-class RunResult:
+class RunResult(NamedTuple):
     ok: bool
     code: int
     stdout: str
@@ -6,6 +6,11 @@ from pathlib import Path
 
 APP_TITLE = "Codex Frontend"
 CONF_FILENAME = "codex_frontend_config.json"
+UPDATE_CACHE_FILENAME = "update.json"
+# How long a "codex is current" answer is trusted before asking npm/GitHub again.
+UPDATE_CHECK_TTL_SECONDS = 24 * 60 * 60
+# ~/.codex/auth.json or config.toml touched within this window skips 'codex auth status'.
+AUTH_TRUST_SECONDS = 30 * 24 * 60 * 60
 
 DEFAULT_APPROVAL_POLICY = "never"
 DEFAULT_SANDBOX_MODE = "danger-full-access"
@@ -18,8 +23,15 @@ DEFAULT_MODEL: str = "gpt-5.1-codex-max"
 DEFAULT_REASONING_LEVEL: str = "medium"
 DEFAULT_TRUST_PATHS = ["/root", "/home", "/mnt/c", "/mnt/c/Users"]
 DEFAULT_CONVERSATION_TOKEN_BUDGET = 8000
+# Oldest output-log lines / thinking chunks are dropped past these counts.
+MAX_LOG_LINES = 5000
+MAX_THINKING_CHUNKS = 1000
+# The output log is also trimmed once its text passes this many characters.
+MAX_LOG_CHARS = 2 * 1024 * 1024
 HISTORY_INCLUDE_DIR_NAMES = ("sessions", "history", "conversations", "front_conversations")
 HISTORY_INCLUDE_SUFFIXES = (".json", ".jsonl", ".md", ".markdown", ".txt", ".log")
+# Newest history files shown in the list; 0 lists every file.
+HISTORY_LIST_LIMIT = 0
 DEFAULT_EXEC_PROMPT = "Health check: state your current approval policy and sandbox mode, then stop."
 
 
@@ -86,3 +98,12 @@ def conf_path() -> Path:
     except Exception:
         pass
     return path
+
+
+def cache_dir() -> Path:
+    """Directory for disposable per-user caches (update checks, etc)."""
+    return Path.home() / ".cache" / "codex-frontend"
+
+
+def update_cache_path() -> Path:
+    return cache_dir() / UPDATE_CACHE_FILENAME
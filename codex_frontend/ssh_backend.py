@@ -1,72 +1,165 @@
 """SSH backend implementation for remote Codex execution."""
 from __future__ import annotations
 
+import queue
 import threading
 import time
-from typing import Callable, List, Optional, Tuple
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
 import paramiko
 
+from . import parsing
 from .run_result import RunResult
+from .wsl import sudo_script
 
 ENV_PREFIX = "export NO_COLOR=1 CLICOLOR=0 CI=1 TERM=dumb;"
+MAX_CONNECTIONS = 8
+KEEPALIVE_SECONDS = 30
 
 
 def bash_single_quote(text: str) -> str:
     return "'" + text.replace("'", "'\"'\"'") + "'"
 
 
+class _SSHPool:
+    """Bounded pool of authenticated SSH clients for one host/port/user."""
+
+    def __init__(self, host: str, port: int, username: str, password: str, max_connections: int = MAX_CONNECTIONS):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.max_connections = max(1, max_connections)
+        self._idle: "queue.LifoQueue[paramiko.SSHClient]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+
+    def _connect(self) -> paramiko.SSHClient:
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        client.connect(
+            hostname=self.host,
+            port=self.port,
+            username=self.username,
+            password=self.password,
+            look_for_keys=False,
+            allow_agent=False,
+            timeout=15,
+        )
+        transport = client.get_transport()
+        if transport is not None:
+            transport.set_keepalive(KEEPALIVE_SECONDS)
+        return client
+
+    @staticmethod
+    def _is_alive(client: paramiko.SSHClient) -> bool:
+        transport = client.get_transport()
+        if transport is None or not transport.is_active():
+            return False
+        try:
+            transport.send_ignore()
+        except (paramiko.SSHException, EOFError, OSError):
+            return False
+        return True
+
+    def _discard(self, client: paramiko.SSHClient) -> None:
+        try:
+            client.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._created = max(0, self._created - 1)
+
+    def _acquire(self) -> paramiko.SSHClient:
+        while True:
+            try:
+                client = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_grow = self._created < self.max_connections
+                    if can_grow:
+                        self._created += 1
+                if can_grow:
+                    try:
+                        return self._connect()
+                    except BaseException:
+                        with self._lock:
+                            self._created -= 1
+                        raise
+                try:
+                    # Poll so a slot freed by a discarded client is noticed.
+                    client = self._idle.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+            if self._is_alive(client):
+                return client
+            self._discard(client)
+
+    @contextmanager
+    def borrow(self) -> Iterator[paramiko.SSHClient]:
+        """Yield a live client; it returns to the pool unless the command failed at the SSH layer."""
+        client = self._acquire()
+        try:
+            yield client
+        except (paramiko.SSHException, EOFError, OSError):
+            self._discard(client)
+            raise
+        except BaseException:
+            self._idle.put(client)
+            raise
+        else:
+            self._idle.put(client)
+
+    def close(self) -> None:
+        while True:
+            try:
+                client = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(client)
+
+
+_POOLS: Dict[Tuple[str, int, str], _SSHPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def _get_pool(host: str, port: int, username: str, password: str) -> _SSHPool:
+    """Return the shared pool for host/port/user, replacing it if the password changed."""
+    key = (host, int(port), username)
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is not None and pool.password == password:
+            return pool
+        if pool is not None:
+            pool.close()
+        pool = _SSHPool(host, int(port), username, password)
+        _POOLS[key] = pool
+        return pool
+
+
 class SSHBackend:
     def __init__(self, host: str, port: int, username: str, password: str):
         self.host = host
         self.port = port
         self.username = username
         self.password = password
-        self._client: Optional[paramiko.SSHClient] = None
-        self._lock = threading.Lock()
+        # Pools outlive backend instances so reconnect toggles reuse live sessions.
+        self._pool = _get_pool(host, port, username, password)
 
     def description(self) -> str:
         return f"Remote SSH {self.username}@{self.host}:{self.port}"
 
     def detect_os(self) -> str:
-        res = self.run_shell("grep -E '^(PRETTY_NAME|NAME)=' /etc/os-release || uname -s", None, 5)
-        if not res.ok:
-            return "Unknown Linux"
-        
-        text = res.stdout.strip()
-        if "PRETTY_NAME=" in text:
-            for line in text.splitlines():
-                if line.startswith("PRETTY_NAME="):
-                    return line.split("=", 1)[1].strip('"')
-        if "NAME=" in text:
-             for line in text.splitlines():
-                if line.startswith("NAME="):
-                    return line.split("=", 1)[1].strip('"')
-        return text or "Unknown Linux"
+        return self.detect_system()[0]
 
     def detect_arch(self) -> str:
-        res = self.run_shell("uname -m", None, 5)
-        if not res.ok:
-            return "unknown"
-        return res.stdout.strip()
+        return self.detect_system()[1]
 
-    def _ensure_client(self) -> paramiko.SSHClient:
-        with self._lock:
-            if self._client and self._client.get_transport() and self._client.get_transport().is_active():
-                return self._client
-            client = paramiko.SSHClient()
-            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            client.connect(
-                hostname=self.host,
-                port=self.port,
-                username=self.username,
-                password=self.password,
-                look_for_keys=False,
-                allow_agent=False,
-                timeout=15,
-            )
-            self._client = client
-            return client
+    def detect_system(self) -> Tuple[str, str]:
+        res = self.run_shell(parsing.SYSTEM_PROBE_SCRIPT, None, 5)
+        os_name, arch = parsing.split_system_probe(res.stdout)
+        return os_name or "Unknown Linux", arch or "unknown"
 
     def _wait_for_exit(self, channel: paramiko.Channel, timeout: Optional[int]) -> Tuple[bool, int]:
         if timeout is None:
@@ -82,18 +175,27 @@ class SSHBackend:
                 return True, 124
             time.sleep(0.1)
 
-    def run_shell(self, script: str, input_text: Optional[str], timeout: Optional[int]) -> RunResult:
+    def run_shell(self, script: str, input_text: Optional[str] = None, timeout: Optional[int] = None) -> RunResult:
         cmd = f"bash -lc {bash_single_quote(script)}"
         return self._exec_command(cmd, input_text, timeout)
 
-    def run_as_root(self, cmd: str, password: Optional[str], timeout: Optional[int]) -> RunResult:
-        if password:
-            # Use sudo -S to read password from stdin
-            wrapped = f"sudo -S -p '' bash -lc {bash_single_quote(f'{ENV_PREFIX} {cmd}')}"
-            return self._exec_command(wrapped, input_text=password + "\n", timeout=timeout)
+    def _needs_sudo(self, password: Optional[str]) -> bool:
+        # Already root: sudo would only add a process and a password round-trip.
+        return bool(password) and self.username != "root"
+
+    def run_as_root(
+        self,
+        cmd: str,
+        password: Optional[str],
+        timeout: Optional[int] = None,
+        input_text: Optional[str] = None,
+    ) -> RunResult:
+        if self._needs_sudo(password):
+            wrapped = f"bash -c {bash_single_quote(sudo_script(cmd, ENV_PREFIX))}"
+            return self._exec_command(wrapped, input_text=password + "\n" + (input_text or ""), timeout=timeout)
         
         wrapped = f"bash -lc {bash_single_quote(f'{ENV_PREFIX} {cmd}')}"
-        return self._exec_command(wrapped, None, timeout)
+        return self._exec_command(wrapped, input_text, timeout)
 
     def stream_as_root(
         self,
@@ -103,11 +205,8 @@ class SSHBackend:
         stdout_cb: Optional[Callable[[str], None]],
         stderr_cb: Optional[Callable[[str], None]],
     ) -> RunResult:
-        if password:
-            wrapped = f"sudo -S -p '' bash -lc {bash_single_quote(f'{ENV_PREFIX} {cmd}')}"
-            # We need to write password to stdin. _stream_command doesn't support input_text yet.
-            # We'll need to modify _stream_command or handle it here.
-            # Modifying _stream_command is cleaner.
+        if self._needs_sudo(password):
+            wrapped = f"bash -c {bash_single_quote(sudo_script(cmd, ENV_PREFIX))}"
             return self._stream_command(wrapped, password + "\n", timeout, stdout_cb, stderr_cb)
 
         wrapped = f"bash -lc {bash_single_quote(f'{ENV_PREFIX} {cmd}')}"
@@ -120,32 +219,31 @@ class SSHBackend:
         timeout: Optional[int],
     ) -> RunResult:
         try:
-            client = self._ensure_client()
-            stdin, stdout, stderr = client.exec_command(command)
-            channel = stdout.channel
-            
-            # Force binary mode
-            for stream in (stdout, stderr):
-                if hasattr(stream, "_set_mode"):
-                    stream._set_mode("b")
-
-            if input_text:
-                stdin.write(input_text)
-                if not input_text.endswith("\n"):
-                    stdin.write("\n")
-                stdin.flush()
-            stdin.close()
-
-            timed_out, exit_status = self._wait_for_exit(channel, timeout)
-            # Decode with replace to handle binary/garbage output safely
-            stdout_text = stdout.read().decode("utf-8", errors="replace")
-            stderr_text = stderr.read().decode("utf-8", errors="replace")
-            if timed_out:
-                exit_status = 124
-            ok = exit_status == 0
-            if timed_out and not stderr_text:
-                stderr_text = f"Timeout after {timeout or 0} seconds"
-            return RunResult(ok, exit_status, stdout_text, stderr_text)
+            with self._pool.borrow() as client:
+                stdin, stdout, stderr = client.exec_command(command)
+                channel = stdout.channel
+
+                # Force binary mode
+                for stream in (stdout, stderr):
+                    if hasattr(stream, "_set_mode"):
+                        stream._set_mode("b")
+
+                if input_text:
+                    # Sent as-is: a payload without a final newline must arrive without one.
+                    stdin.write(input_text.encode("utf-8"))
+                    stdin.flush()
+                stdin.close()
+
+                timed_out, exit_status = self._wait_for_exit(channel, timeout)
+                # Decode with replace to handle binary/garbage output safely
+                stdout_text = stdout.read().decode("utf-8", errors="replace")
+                stderr_text = stderr.read().decode("utf-8", errors="replace")
+                if timed_out:
+                    exit_status = 124
+                ok = exit_status == 0
+                if timed_out and not stderr_text:
+                    stderr_text = f"Timeout after {timeout or 0} seconds"
+                return RunResult(ok, exit_status, stdout_text, stderr_text)
         except (paramiko.SSHException, EOFError, OSError) as exc:
             return RunResult(False, 255, "", f"SSH Error: {exc}")
 
@@ -158,58 +256,57 @@ class SSHBackend:
         stderr_cb: Optional[Callable[[str], None]],
     ) -> RunResult:
         try:
-            client = self._ensure_client()
-            stdin, stdout, stderr = client.exec_command(command)
-            channel = stdout.channel
-
-            # Force binary mode to prevent Paramiko from crashing on non-UTF8 bytes
-            for stream in (stdout, stderr):
-                if hasattr(stream, "_set_mode"):
-                    stream._set_mode("b")
-            
-            if input_text:
-                stdin.write(input_text)
-                if not input_text.endswith("\n"):
-                    stdin.write("\n")
-                stdin.flush()
-            stdin.close()
-
-            stdout_chunks: List[str] = []
-            stderr_chunks: List[str] = []
-
-            def _consume(stream, chunks: List[str], callback: Optional[Callable[[str], None]]):
-                while True:
-                    try:
-                        line = stream.readline()
-                    except Exception:
-                        break
-                    if not line:
-                        break
-                    if isinstance(line, bytes):
-                        line = line.decode("utf-8", errors="replace")
-                    chunks.append(line)
-                    if callback:
-                        callback(line)
-
-            threads: List[threading.Thread] = []
-            t_out = threading.Thread(target=_consume, args=(stdout, stdout_chunks, stdout_cb), daemon=True)
-            t_err = threading.Thread(target=_consume, args=(stderr, stderr_chunks, stderr_cb), daemon=True)
-            t_out.start()
-            t_err.start()
-            threads.extend([t_out, t_err])
-
-            timed_out, exit_status = self._wait_for_exit(channel, timeout)
-
-            for t in threads:
-                t.join()
-
-            stdout_text = "".join(stdout_chunks)
-            stderr_text = "".join(stderr_chunks)
-            if timed_out:
-                exit_status = 124
-            ok = exit_status == 0
-            if timed_out and not stderr_text:
-                stderr_text = f"Timeout after {timeout or 0} seconds"
-            return RunResult(ok, exit_status, stdout_text, stderr_text)
+            with self._pool.borrow() as client:
+                stdin, stdout, stderr = client.exec_command(command)
+                channel = stdout.channel
+
+                # Force binary mode to prevent Paramiko from crashing on non-UTF8 bytes
+                for stream in (stdout, stderr):
+                    if hasattr(stream, "_set_mode"):
+                        stream._set_mode("b")
+
+                if input_text:
+                    # Sent as-is: a payload without a final newline must arrive without one.
+                    stdin.write(input_text.encode("utf-8"))
+                    stdin.flush()
+                stdin.close()
+
+                stdout_chunks: List[str] = []
+                stderr_chunks: List[str] = []
+
+                def _consume(stream, chunks: List[str], callback: Optional[Callable[[str], None]]):
+                    while True:
+                        try:
+                            line = stream.readline()
+                        except Exception:
+                            break
+                        if not line:
+                            break
+                        if isinstance(line, bytes):
+                            line = line.decode("utf-8", errors="replace")
+                        chunks.append(line)
+                        if callback:
+                            callback(line)
+
+                threads: List[threading.Thread] = []
+                t_out = threading.Thread(target=_consume, args=(stdout, stdout_chunks, stdout_cb), daemon=True)
+                t_err = threading.Thread(target=_consume, args=(stderr, stderr_chunks, stderr_cb), daemon=True)
+                t_out.start()
+                t_err.start()
+                threads.extend([t_out, t_err])
+
+                timed_out, exit_status = self._wait_for_exit(channel, timeout)
+
+                for t in threads:
+                    t.join()
+
+                stdout_text = "".join(stdout_chunks)
+                stderr_text = "".join(stderr_chunks)
+                if timed_out:
+                    exit_status = 124
+                ok = exit_status == 0
+                if timed_out and not stderr_text:
+                    stderr_text = f"Timeout after {timeout or 0} seconds"
+                return RunResult(ok, exit_status, stdout_text, stderr_text)
         except (paramiko.SSHException, EOFError, OSError) as exc:
             return RunResult(False, 255, "", f"SSH Error: {exc}")
@@ -1,11 +1,12 @@
 """wxPython panels and dialogs used by the Codex frontend."""
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, List
+from typing import IO, TYPE_CHECKING, List
 
 import wx
 
-from . import settings
+from . import configuration, settings
+from .messages import LoadConfigMsg, OpenHistoryMsg, RefreshHistoryMsg, SaveConfigMsg
 
 if TYPE_CHECKING:  # pragma: no cover - typing only
     from .mainframe import MainFrame
@@ -89,7 +90,12 @@ class OptionsPanel(wx.Panel):
         sizer.Add(btn_sizer, 0, wx.ALL, 6)
 
         self.SetSizer(sizer)
+        self.reset_to_defaults()
 
+        self.load_btn.Bind(wx.EVT_BUTTON, self.on_load)
+        self.save_btn.Bind(wx.EVT_BUTTON, self.on_save)
+
+    def reset_to_defaults(self) -> None:
         self.approval_cb.SetStringSelection(settings.DEFAULT_APPROVAL_POLICY)
         self.sandbox_cb.SetStringSelection(settings.DEFAULT_SANDBOX_MODE)
         self.web_search_cb.SetValue(settings.DEFAULT_ENABLE_WEB_SEARCH)
@@ -102,12 +108,9 @@ class OptionsPanel(wx.Panel):
         self.auto_update_cb.SetValue(getattr(settings, "DEFAULT_AUTO_UPDATE_CODEX", True))
         self.trust_txt.SetValue("\n".join(settings.DEFAULT_TRUST_PATHS))
 
-        self.load_btn.Bind(wx.EVT_BUTTON, self.on_load)
-        self.save_btn.Bind(wx.EVT_BUTTON, self.on_save)
-
     def on_load(self, _evt):
         pw = self.mainframe.get_password()
-        self.mainframe.worker.q.put({"action": "load_config", "password": pw if pw else None})
+        self.mainframe.worker.submit(LoadConfigMsg(pw if pw else None))
 
     def on_save(self, _evt):
         pw = self.mainframe.get_password()
@@ -123,19 +126,18 @@ class OptionsPanel(wx.Panel):
             self.mainframe.auto_update_codex = auto_update
         except Exception:
             pass
-        self.mainframe.worker.q.put(
-            {
-                "action": "save_config",
-                "password": pw if pw else None,
-                "model": model,
-                "approval_policy": approval,
-                "sandbox_mode": sandbox,
-                "web_search": web_search,
-                "intelligence": intelligence,
-                "reasoning_level": reasoning,
-                "auto_update_codex": auto_update,
-                "trust_paths": trust_paths,
-            }
+        self.mainframe.worker.submit(
+            SaveConfigMsg(
+                password=pw if pw else None,
+                model=model,
+                approval_policy=approval,
+                sandbox_mode=sandbox,
+                web_search=web_search,
+                intelligence=intelligence,
+                reasoning_level=reasoning,
+                auto_update_codex=auto_update,
+                trust_paths=trust_paths,
+            )
         )
 
     def set_from_toml(self, toml_text: str) -> None:
@@ -158,7 +160,7 @@ class OptionsPanel(wx.Panel):
             if "=" in line:
                 key, value = line.split("=", 1)
                 key = key.strip()
-                value = value.strip().strip('"')
+                value = configuration.toml_unquote(value)
                 if section == "root":
                     if key == "model":
                         model = value
@@ -173,7 +175,7 @@ class OptionsPanel(wx.Panel):
                 elif section == "tools" and key == "web_search":
                     web_search = value.lower() in ("1", "true", "yes", "on")
             if section.startswith('projects."') and line.startswith("trust_level"):
-                path = section[len('projects."'):-1]
+                path = configuration.toml_unquote(section[len("projects."):])
                 trust_paths.append(path)
 
         self.model_cb.SetValue(model)
@@ -213,16 +215,23 @@ class OptionsDialog(wx.Dialog):
     def set_from_toml(self, toml_text: str) -> None:
         self.panel.set_from_toml(toml_text)
 
+    def reset_to_defaults(self) -> None:
+        self.panel.reset_to_defaults()
+
     def on_close(self, _evt):
         self.EndModal(wx.ID_OK)
 
 
 class RunLogDialog(wx.Dialog):
-    def __init__(self, parent: wx.Window, text: str):
+    # Characters moved into the viewer per UI event while a log streams in.
+    LOAD_CHUNK = 256 * 1024
+
+    def __init__(self, parent: wx.Window):
         super().__init__(parent, title="Codex raw run log", size=(640, 480))
+        # Bumped on every load/clear so chunks of an older load stop arriving.
+        self._load_gen = 0
         sizer = wx.BoxSizer(wx.VERTICAL)
         self.viewer = wx.TextCtrl(self, style=wx.TE_MULTILINE | wx.TE_READONLY | wx.TE_RICH2)
-        self.viewer.SetValue(text or "(no log captured)")
         sizer.Add(self.viewer, 1, wx.EXPAND | wx.ALL, 10)
         close_btn = wx.Button(self, label="Close")
         close_btn.Bind(wx.EVT_BUTTON, self.on_close)
@@ -232,6 +241,41 @@ class RunLogDialog(wx.Dialog):
         sizer.Add(btn_sizer, 0, wx.EXPAND | wx.LEFT | wx.RIGHT | wx.BOTTOM, 10)
         self.SetSizerAndFit(sizer)
 
+    def load(self, source: IO[str]) -> None:
+        """Show source from its start: the first chunk now, the rest a chunk per UI event.
+
+        The dialog opens at the same speed for any log size, and the log is never
+        copied into one Python string on the way.
+        """
+        self._load_gen += 1
+        source.seek(0)
+        first = source.read(self.LOAD_CHUNK)
+        self.viewer.ChangeValue(first or "(no log captured)")
+        self.viewer.SetInsertionPoint(0)
+        if len(first) == self.LOAD_CHUNK:
+            wx.CallAfter(self._load_more, source, self._load_gen)
+
+    def _load_more(self, source: IO[str], gen: int) -> None:
+        if not self or gen != self._load_gen:
+            return
+        chunk = source.read(self.LOAD_CHUNK)
+        if not chunk:
+            return
+        caret = self.viewer.GetInsertionPoint()
+        self.viewer.Freeze()
+        try:
+            self.viewer.SetInsertionPointEnd()
+            self.viewer.WriteText(chunk)
+            self.viewer.SetInsertionPoint(caret)
+        finally:
+            self.viewer.Thaw()
+        if len(chunk) == self.LOAD_CHUNK:
+            wx.CallAfter(self._load_more, source, gen)
+
+    def clear(self) -> None:
+        self._load_gen += 1
+        self.viewer.ChangeValue("")
+
     def on_close(self, _evt):
         self.EndModal(wx.ID_OK)
 
@@ -299,13 +343,7 @@ class HistoryPanel(wx.Panel):
 
     def on_refresh(self, _evt):
         pw = self.mainframe.get_password()
-        self.mainframe.worker.q.put(
-            {
-                "action": "refresh_history",
-                "password": pw if pw else None,
-                "conversation_dir": self.mainframe.get_conversation_dir(),
-            }
-        )
+        self.mainframe.worker.submit(RefreshHistoryMsg(pw if pw else None, self.mainframe.get_conversation_dir()))
 
     def on_open(self, _evt):
         sel = self.listbox.GetSelection()
@@ -313,7 +351,7 @@ class HistoryPanel(wx.Panel):
             return
         path = self.listbox.GetClientData(sel) or self.listbox.GetString(sel)
         pw = self.mainframe.get_password()
-        self.mainframe.worker.q.put({"action": "open_history", "password": pw if pw else None, "path": path})
+        self.mainframe.worker.submit(OpenHistoryMsg(pw if pw else None, path))
         self.mainframe.set_current_conversation(path)
 
     def populate(self, items: List[str]) -> None:
@@ -431,7 +469,7 @@ class HistoryPanel(wx.Panel):
             wsl_path = settings.windows_to_wsl_path(path)
             if wsl_path:
                 pw = self.mainframe.get_password()
-                self.mainframe.worker.q.put({"action": "open_history", "password": pw if pw else None, "path": wsl_path})
+                self.mainframe.worker.submit(OpenHistoryMsg(pw if pw else None, wsl_path))
                 self.mainframe.set_current_conversation(wsl_path)
             else:
                 wx.MessageBox(
@@ -0,0 +1,84 @@
+"""Directory walking through FindFirstFileExW for Windows hosts."""
+from __future__ import annotations
+
+import os
+from typing import Iterator, List, Tuple
+
+AVAILABLE = False
+INVALID_HANDLE_VALUE = -1
+
+if os.name == "nt":  # pragma: no cover - Windows-specific
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+
+        kernel32.FindFirstFileExW.argtypes = [
+            wintypes.LPCWSTR,
+            ctypes.c_int,
+            ctypes.POINTER(wintypes.WIN32_FIND_DATAW),
+            ctypes.c_int,
+            ctypes.c_void_p,
+            wintypes.DWORD,
+        ]
+        kernel32.FindFirstFileExW.restype = wintypes.HANDLE
+
+        kernel32.FindNextFileW.argtypes = [wintypes.HANDLE, ctypes.POINTER(wintypes.WIN32_FIND_DATAW)]
+        kernel32.FindNextFileW.restype = wintypes.BOOL
+
+        kernel32.FindClose.argtypes = [wintypes.HANDLE]
+        kernel32.FindClose.restype = wintypes.BOOL
+
+        INVALID_HANDLE_VALUE = ctypes.c_void_p(-1).value
+        AVAILABLE = True
+    except (ImportError, OSError, AttributeError):
+        AVAILABLE = False
+
+FIND_EX_INFO_BASIC = 1  # skip the 8.3 short name lookup
+FIND_EX_SEARCH_NAME_MATCH = 0
+FIND_FIRST_EX_LARGE_FETCH = 2  # larger kernel buffer per directory query
+FILE_ATTRIBUTE_DIRECTORY = 0x10
+FILE_ATTRIBUTE_REPARSE_POINT = 0x400
+# Seconds between 1601-01-01 (FILETIME epoch) and 1970-01-01.
+EPOCH_OFFSET_SECONDS = 11644473600
+
+
+def _list_dir(path: str) -> Iterator[Tuple[str, int, float]]:
+    """Yield (name, attributes, mtime) for each entry of one directory, or nothing if unreadable."""
+    data = wintypes.WIN32_FIND_DATAW()
+    handle = kernel32.FindFirstFileExW(
+        os.path.join(path, "*"),
+        FIND_EX_INFO_BASIC,
+        ctypes.byref(data),
+        FIND_EX_SEARCH_NAME_MATCH,
+        None,
+        FIND_FIRST_EX_LARGE_FETCH,
+    )
+    if handle is None or handle == INVALID_HANDLE_VALUE:
+        return
+    try:
+        while True:
+            name = data.cFileName
+            if name not in (".", ".."):
+                ft = data.ftLastWriteTime
+                ticks = (ft.dwHighDateTime << 32) | ft.dwLowDateTime
+                yield name, data.dwFileAttributes, ticks / 1e7 - EPOCH_OFFSET_SECONDS
+            if not kernel32.FindNextFileW(handle, ctypes.byref(data)):
+                break
+    finally:
+        kernel32.FindClose(handle)
+
+
+def scan_files_with_mtime(base: str, suffixes: Tuple[str, ...], max_depth: int) -> Iterator[Tuple[float, str]]:
+    """Same contract as history.scan_files_with_mtime, with the mtime taken from the find data."""
+    stack: List[Tuple[str, int]] = [(base, 0)]
+    while stack:
+        path, depth = stack.pop()
+        for name, attrs, mtime in _list_dir(path):
+            if attrs & FILE_ATTRIBUTE_DIRECTORY:
+                # Never descend through reparse points (symlinks, junctions): no loops, no remote stalls.
+                if depth < max_depth and not attrs & FILE_ATTRIBUTE_REPARSE_POINT:
+                    stack.append((os.path.join(path, name), depth + 1))
+            elif name.lower().endswith(suffixes):
+                yield mtime, os.path.join(path, name)
@@ -1,8 +1,10 @@
 """Background worker thread for the Codex frontend."""
 from __future__ import annotations
 
+import itertools
 import queue
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
@@ -15,18 +17,61 @@ from . import history
 from . import parsing
 from . import settings
 from . import ui_panels
+from .messages import (
+    LoadConfigMsg,
+    NewConversationMsg,
+    OpenHistoryMsg,
+    PipelineMsg,
+    RefreshHistoryMsg,
+    RunCmdMsg,
+    SaveConfigMsg,
+    StopMsg,
+    UpdateConversationDirMsg,
+    WorkerMessage,
+)
 from .run_result import RunResult
 
 
+# Lower runs first; equal priorities keep submission order.
+PRIO_INTERACTIVE = 0
+PRIO_BULK = 5
+
+# Anything not listed is interactive. Only work that is safe to run after a later
+# user action is demoted: a new conversation must stay ahead of the prompt that follows it.
+_MESSAGE_PRIORITY: Dict[type, int] = {
+    UpdateConversationDirMsg: PRIO_BULK,
+}
+
+# Read-only history lookups run on a side thread so browsing history does not wait
+# for a prompt that is still running; everything else stays ordered on the worker.
+_SIDE_MESSAGES = (RefreshHistoryMsg, OpenHistoryMsg)
+
+
 class Worker(threading.Thread):
     def __init__(self, ui_ref):
         super().__init__(daemon=True)
         self.ui = ui_ref
-        self.q: "queue.Queue[dict]" = queue.Queue()
+        self.q: "queue.PriorityQueue[Tuple[int, int, WorkerMessage]]" = queue.PriorityQueue()
+        self._seq = itertools.count()
         self.should_stop = threading.Event()
         self.session_ids: Dict[str, Optional[str]] = {}
         self.last_prompt_text: str = ""
         self.last_answer_first_line: str = ""
+        # One side thread keeps history lookups in submission order among themselves.
+        self._side_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="codex-history")
+        # Set while the worker thread runs an action; side jobs then leave the task label alone.
+        self._main_busy = False
+
+    def submit(self, msg: WorkerMessage, priority: Optional[int] = None) -> None:
+        """Queue msg; history lookups go to the side thread, the rest to the ordered queue."""
+        if isinstance(msg, _SIDE_MESSAGES):
+            if not self.should_stop.is_set():
+                self._side_pool.submit(self._run_side, msg)
+            return
+        if priority is None:
+            priority = _MESSAGE_PRIORITY.get(type(msg), PRIO_INTERACTIVE)
+        # The sequence number breaks ties so messages themselves are never compared.
+        self.q.put((priority, next(self._seq), msg))
 
     def log(self, msg: str) -> None:
         if not msg:
@@ -43,52 +88,69 @@ class Worker(threading.Thread):
         self.ui.append_worker_log(msg)
 
     def set_task(self, msg: str) -> None:
+        if self._main_busy and threading.current_thread() is not self:
+            return
         self.ui.set_task(msg)
 
+    def _run_side(self, item: WorkerMessage) -> None:
+        try:
+            with backend.pinned_backend():
+                self._dispatch(item)
+        except Exception as exc:  # pragma: no cover - defensive
+            self.log(f"Worker exception: {exc}")
+
     def run(self) -> None:  # pragma: no cover - thread loop
         while not self.should_stop.is_set():
             try:
-                item = self.q.get(timeout=0.1)
+                _priority, _seq, item = self.q.get(timeout=0.1)
             except queue.Empty:
                 continue
+            self._main_busy = True
             try:
-                action = item.get("action")
-                if action == "pipeline":
-                    self.pipeline(item.get("password"), item.get("conversation_dir"))
-                elif action == "run_cmd":
-                    self.run_cmd(
-                        password=item.get("password"),
-                        prompt=item.get("prompt"),
-                        conversation=item.get("conversation"),
-                        conversation_dir=item.get("conversation_dir"),
-                    )
-                elif action == "load_config":
-                    self.load_config(item.get("password"))
-                elif action == "save_config":
-                    self.save_config(
-                        password=item.get("password"),
-                        model=item.get("model"),
-                        approval_policy=item.get("approval_policy"),
-                        sandbox_mode=item.get("sandbox_mode"),
-                        web_search=item.get("web_search"),
-                        intelligence=item.get("intelligence"),
-                        reasoning_level=item.get("reasoning_level"),
-                        auto_update_codex=item.get("auto_update_codex"),
-                        trust_paths=item.get("trust_paths"),
-                    )
-                elif action == "refresh_history":
-                    self.refresh_history(item.get("password"), item.get("conversation_dir"))
-                elif action == "open_history":
-                    self.open_history(item.get("password"), item.get("path"))
-                elif action == "new_conversation":
-                    self.new_conversation(item.get("password"), item.get("conversation_dir"))
-                elif action == "update_conversation_directory":
-                    self.update_conversation_directory(item.get("password"))
-                elif action == "stop":
-                    self.should_stop.set()
+                # Pin the backend so a connection switch cannot change it mid-action.
+                with backend.pinned_backend():
+                    self._dispatch(item)
             except Exception as exc:  # pragma: no cover - defensive
                 self.log(f"Worker exception: {exc}")
-    
+            finally:
+                self._main_busy = False
+        self._side_pool.shutdown(wait=False, cancel_futures=True)
+
+    def _dispatch(self, item: WorkerMessage) -> None:
+        if isinstance(item, PipelineMsg):
+            self.pipeline(item.password, item.conversation_dir)
+        elif isinstance(item, RunCmdMsg):
+            self.run_cmd(
+                password=item.password,
+                prompt=item.prompt,
+                conversation=item.conversation,
+                conversation_dir=item.conversation_dir,
+            )
+        elif isinstance(item, LoadConfigMsg):
+            self.load_config(item.password)
+        elif isinstance(item, SaveConfigMsg):
+            self.save_config(
+                password=item.password,
+                model=item.model,
+                approval_policy=item.approval_policy,
+                sandbox_mode=item.sandbox_mode,
+                web_search=item.web_search,
+                intelligence=item.intelligence,
+                reasoning_level=item.reasoning_level,
+                auto_update_codex=item.auto_update_codex,
+                trust_paths=item.trust_paths,
+            )
+        elif isinstance(item, RefreshHistoryMsg):
+            self.refresh_history(item.password, item.conversation_dir)
+        elif isinstance(item, OpenHistoryMsg):
+            self.open_history(item.password, item.path)
+        elif isinstance(item, NewConversationMsg):
+            self.new_conversation(item.password, item.conversation_dir)
+        elif isinstance(item, UpdateConversationDirMsg):
+            self.update_conversation_directory(item.password)
+        elif isinstance(item, StopMsg):
+            self.should_stop.set()
+
     def update_conversation_directory(self, password: Optional[str]) -> None:
         self.set_task("Updating conversation directory")
         conv_dir = self._get_conversation_dir_for_model(password)
@@ -386,11 +448,13 @@ class Worker(threading.Thread):
         session_state_after = codex_exec.session_snapshot(password)
 
         if conversation_path:
-            ok, msg = history.append_conversation_entry(conversation_path, prompt, stdout_raw, stderr_raw, password)
+            ok, msg, text = history.append_and_read_conversation(
+                conversation_path, prompt, stdout_raw, stderr_raw, password
+            )
             if not ok:
                 self.log(f"Conversation append failed: {msg}")
             else:
-                self.open_history(password, conversation_path)
+                self.ui.show_history_file(conversation_path, text)
             if res.ok:
                 new_session_id = self._determine_session_id(session_state_before, session_state_after)
                 if new_session_id:
@@ -422,7 +486,7 @@ class Worker(threading.Thread):
         new_title = res.stdout.strip()
         # Sanity check
         if len(new_title) > 100 or "\n" in new_title:
-             new_title = new_title.splitlines()[0][:50]
+             new_title = parsing.first_line(new_title)[:50]
         
         ok, new_path, err = history.rename_conversation_file(password, current_path, new_title)
         if ok:
@@ -569,10 +633,13 @@ class Worker(threading.Thread):
             self.ui.populate_history_list([])
             self.set_task("Idle")
             return
-        ok, msg = history.ensure_conversation_dir(password, conversation_dir)
-        if not ok:
-            self.log(f"Conversation dir error: {msg}")
-        items, err = history.list_codex_history(password, conversation_dir)
+        # create=True folds the mkdir into the listing call instead of a separate round-trip.
+        items, err = history.list_codex_history(
+            password, conversation_dir, create=True, limit=settings.HISTORY_LIST_LIMIT or None
+        )
+        if self.should_stop.is_set():
+            # Replaced by a new worker (e.g. connection switch); its listing is the current one.
+            return
         self.ui.populate_history_list(items)
         if err:
             self.log(f"History scan error: {err}")
@@ -588,6 +655,12 @@ class Worker(threading.Thread):
         self.set_task("Idle")
 
     def new_conversation(self, password: Optional[str], conversation_dir: Optional[str]) -> None:
+        try:
+            self._new_conversation(password, conversation_dir)
+        finally:
+            self.ui.action_done("new_conversation")
+
+    def _new_conversation(self, password: Optional[str], conversation_dir: Optional[str]) -> None:
         self.set_task("Starting new conversation")
         if not conversation_dir:
             self.log("Conversation directory not set. Set it before starting a new conversation.")
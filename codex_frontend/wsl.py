@@ -1,22 +1,44 @@
 """Helper functions for invoking commands inside WSL."""
 from __future__ import annotations
 
+import io
 import subprocess
 import threading
+import time
 from typing import Callable, List, Optional, Tuple
 
 from .run_result import RunResult
 
+PIPE_BUFSIZE = 65536
+
 
 def bash_single_quote(text: str) -> str:
     return "'" + text.replace("'", "'\"'\"'") + "'"
 
 
+AVAILABLE_TTL_SECONDS = 60.0
+_available_checked_at: Optional[float] = None
+
+
 def available() -> bool:
+    """Return whether WSL answers; a positive probe is reused for AVAILABLE_TTL_SECONDS."""
+    global _available_checked_at
+    now = time.monotonic()
+    if _available_checked_at is not None and now - _available_checked_at < AVAILABLE_TTL_SECONDS:
+        return True
+    ok = _probe_available()
+    # Failures are never cached so the next backend switch re-probes.
+    _available_checked_at = now if ok else None
+    return ok
+
+
+def _probe_available() -> bool:
     try:
         cp = subprocess.run(
             ["wsl.exe", "-e", "bash", "-lc", "echo WSL_OK"],
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=PIPE_BUFSIZE,
             text=True,
             encoding="utf-8",
             errors="replace",
@@ -29,28 +51,37 @@ def available() -> bool:
         return False
 
 
+def _encode_input(input_text: Optional[str]) -> Optional[bytes]:
+    # Bytes, not a text-mode pipe: on Windows that would turn every \n of the payload into \r\n.
+    return input_text.encode("utf-8") if input_text is not None else None
+
+
+def _decode_output(data: Optional[bytes]) -> str:
+    # Same result as a text-mode pipe: UTF-8 with replacement and universal newlines.
+    return (data or b"").decode("utf-8", errors="replace").replace("\r\n", "\n").replace("\r", "\n")
+
+
 def run_wsl_bash(script: str, input_text: Optional[str] = None, timeout: Optional[int] = None) -> RunResult:
     args = ["wsl.exe", "-e", "bash", "-lc", script]
     try:
         cp = subprocess.run(
             args,
-            input=input_text,
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
+            input=_encode_input(input_text),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=PIPE_BUFSIZE,
             timeout=timeout,
         )
-        return RunResult(cp.returncode == 0, cp.returncode, cp.stdout, cp.stderr)
+        return RunResult(cp.returncode == 0, cp.returncode, _decode_output(cp.stdout), _decode_output(cp.stderr))
     except FileNotFoundError as exc:
         return RunResult(False, 127, "", f"wsl.exe not found: {exc}")
     except subprocess.TimeoutExpired as exc:
-        return RunResult(False, 124, exc.stdout or "", f"Timeout: {exc}")
+        return RunResult(False, 124, _decode_output(exc.stdout), f"Timeout: {exc}")
     except Exception as exc:  # pragma: no cover - defensive
         return RunResult(False, 1, "", f"Exception: {exc}")
 
 
-def run_wsl_root_user(cmd: str, timeout: Optional[int] = None) -> RunResult:
+def run_wsl_root_user(cmd: str, timeout: Optional[int] = None, input_text: Optional[str] = None) -> RunResult:
     env_prefix = "export NO_COLOR=1 CLICOLOR=0 CI=1 TERM=dumb;"
     inner = f"{env_prefix} {cmd}"
     script = f"bash -lc {bash_single_quote(inner)}"
@@ -58,30 +89,53 @@ def run_wsl_root_user(cmd: str, timeout: Optional[int] = None) -> RunResult:
     try:
         cp = subprocess.run(
             args,
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
+            input=_encode_input(input_text),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=PIPE_BUFSIZE,
             timeout=timeout,
         )
-        return RunResult(cp.returncode == 0, cp.returncode, cp.stdout, cp.stderr)
+        return RunResult(cp.returncode == 0, cp.returncode, _decode_output(cp.stdout), _decode_output(cp.stderr))
     except Exception as exc:  # pragma: no cover - defensive
         return RunResult(False, 1, "", f"Root fallback exception: {exc}")
 
 
-def run_wsl_sudo(cmd: str, password: str, timeout: Optional[int] = None) -> RunResult:
-    env_prefix = "export NO_COLOR=1 CLICOLOR=0 CI=1 TERM=dumb;"
-    inner = f"sudo -S -p '' bash -lc {bash_single_quote(env_prefix + ' ' + cmd)}"
-    return run_wsl_bash(inner, input_text=password + "\n", timeout=timeout)
+def sudo_script(cmd: str, env_prefix: str = "export NO_COLOR=1 CLICOLOR=0 CI=1 TERM=dumb;") -> str:
+    """Bash script that reads the sudo password from the first stdin line, then runs cmd as root.
+
+    The password reaches `sudo -v` through its own pipe and cmd runs under `sudo -n`, so the rest of
+    stdin arrives untouched even when sudo never prompts (NOPASSWD, already root), and a wrong
+    password fails here instead of sudo retrying with payload lines.
+    """
+    # Without a tty sudo keys its timestamp on the parent PID, so sudo -n must stay a child of this
+    # bash like sudo -v was. The trailing `exit $?` stops bash exec'ing the last command in place.
+    return (
+        "IFS= read -r pw; printf '%s\\n' \"$pw\" | sudo -S -p '' -v || exit 1; unset pw; "
+        f"sudo -n bash -lc {bash_single_quote(env_prefix + ' ' + cmd)}; exit $?"
+    )
+
+
+def run_wsl_sudo(
+    cmd: str,
+    password: str,
+    timeout: Optional[int] = None,
+    input_text: Optional[str] = None,
+) -> RunResult:
+    return run_wsl_bash(sudo_script(cmd), input_text=password + "\n" + (input_text or ""), timeout=timeout)
 
 
-def run_as_root(cmd: str, password: Optional[str], timeout: Optional[int] = None) -> RunResult:
+def run_as_root(
+    cmd: str,
+    password: Optional[str],
+    timeout: Optional[int] = None,
+    input_text: Optional[str] = None,
+) -> RunResult:
     if password:
-        result = run_wsl_sudo(cmd, password, timeout=timeout)
+        result = run_wsl_sudo(cmd, password, timeout=timeout, input_text=input_text)
         if result.ok:
             return result
-        return run_wsl_root_user(cmd, timeout=timeout)
-    return run_wsl_root_user(cmd, timeout=timeout)
+        return run_wsl_root_user(cmd, timeout=timeout, input_text=input_text)
+    return run_wsl_root_user(cmd, timeout=timeout, input_text=input_text)
 
 
 def _stream_subprocess(
@@ -97,10 +151,6 @@ def _stream_subprocess(
             stdin=subprocess.PIPE if input_text is not None else None,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1,
-            encoding="utf-8",
-            errors="replace",
         )
     except FileNotFoundError as exc:
         return RunResult(False, 127, "", f"command not found: {exc}")
@@ -109,9 +159,7 @@ def _stream_subprocess(
 
     if input_text is not None and proc.stdin:
         try:
-            proc.stdin.write(input_text)
-            if not input_text.endswith("\n"):
-                proc.stdin.write("\n")
+            proc.stdin.write(_encode_input(input_text))
         except Exception:
             pass
         finally:
@@ -134,14 +182,13 @@ def _stream_subprocess(
             stream.close()
 
     threads: List[threading.Thread] = []
-    if proc.stdout:
-        t = threading.Thread(target=_consume, args=(proc.stdout, stdout_chunks, stdout_cb), daemon=True)
-        t.start()
-        threads.append(t)
-    if proc.stderr:
-        t = threading.Thread(target=_consume, args=(proc.stderr, stderr_chunks, stderr_cb), daemon=True)
-        t.start()
-        threads.append(t)
+    for pipe, chunks, callback in ((proc.stdout, stdout_chunks, stdout_cb), (proc.stderr, stderr_chunks, stderr_cb)):
+        if pipe:
+            # Only the output side is decoded as text; stdin above stays raw bytes.
+            stream = io.TextIOWrapper(pipe, encoding="utf-8", errors="replace")
+            t = threading.Thread(target=_consume, args=(stream, chunks, callback), daemon=True)
+            t.start()
+            threads.append(t)
 
     timed_out = False
     try:
@@ -200,9 +247,9 @@ def stream_wsl_sudo(
     stdout_cb: Optional[Callable[[str], None]],
     stderr_cb: Optional[Callable[[str], None]],
 ) -> RunResult:
-    env_prefix = "export NO_COLOR=1 CLICOLOR=0 CI=1 TERM=dumb;"
-    inner = f"sudo -S -p '' bash -lc {bash_single_quote(env_prefix + ' ' + cmd)}"
-    return stream_wsl_bash(inner, input_text=password + "\n", timeout=timeout, stdout_cb=stdout_cb, stderr_cb=stderr_cb)
+    return stream_wsl_bash(
+        sudo_script(cmd), input_text=password + "\n", timeout=timeout, stdout_cb=stdout_cb, stderr_cb=stderr_cb
+    )
 
 
 def stream_as_root(
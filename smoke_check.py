@@ -0,0 +1,89 @@
+"""Headless smoke check for the non-UI helpers; needs neither wx nor a real backend.
+
+Run with `python smoke_check.py`. It fails loudly when a module calls a `backend.*`
+helper that does not exist, and drives the remote update check through a canned
+backend so the code path actually executes.
+"""
+from __future__ import annotations
+
+import ast
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from codex_frontend import backend, codex_exec
+from codex_frontend.run_result import RunResult
+
+PACKAGE_DIR = Path(__file__).resolve().parent / "codex_frontend"
+
+# Answers the codex/npm probe as "codex installed and working, no registry answer".
+_PROBE_REPLY = "SHELL_OK|1\nCODEX_PATH|/usr/bin/codex\nCODEX_RC|0\nCODEX_VER|codex-cli 0.0.0\nNPM_PATH|/usr/bin/npm\n"
+
+
+class CannedBackend(backend.BaseBackend):
+    mode = "wsl"
+
+    def description(self) -> str:
+        return "smoke-check"
+
+    def bash_single_quote(self, text: str) -> str:
+        return "'" + text.replace("'", "'\"'\"'") + "'"
+
+    def run_shell(self, script: str, input_text: Optional[str] = None, timeout: Optional[int] = None) -> RunResult:
+        return RunResult(True, 0, _PROBE_REPLY, "")
+
+    def run_as_root(
+        self,
+        cmd: str,
+        password: Optional[str],
+        timeout: Optional[int] = None,
+        input_text: Optional[str] = None,
+    ) -> RunResult:
+        return self.run_shell(cmd, input_text, timeout)
+
+
+def missing_backend_attributes() -> List[str]:
+    """Return "file:line backend.name" for every backend.* reference the module does not define."""
+    missing = []
+    for path in sorted(PACKAGE_DIR.glob("*.py")):
+        tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+        imports_backend = any(
+            isinstance(node, ast.ImportFrom) and node.level == 1 and any(a.name == "backend" for a in node.names)
+            for node in ast.walk(tree)
+        )
+        if not imports_backend:
+            continue
+        for node in ast.walk(tree):
+            if (
+                isinstance(node, ast.Attribute)
+                and isinstance(node.value, ast.Name)
+                and node.value.id == "backend"
+                and not hasattr(backend, node.attr)
+            ):
+                missing.append(f"{path.name}:{node.lineno} backend.{node.attr}")
+    return missing
+
+
+def main() -> int:
+    failures = [f"unknown attribute {ref}" for ref in missing_backend_attributes()]
+    checks = (
+        ("ensure_remote_codex_latest", lambda: codex_exec.ensure_remote_codex_latest(password=None)),
+        ("check_shell_ready", codex_exec.check_shell_ready),
+    )
+    with backend.pinned_backend(CannedBackend()):
+        for name, check in checks:
+            try:
+                ok, msg = check()
+            except Exception as exc:
+                ok, msg = False, f"{type(exc).__name__}: {exc}"
+            if not ok:
+                failures.append(f"{name}: {msg}")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if not failures:
+        print("smoke check OK")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())